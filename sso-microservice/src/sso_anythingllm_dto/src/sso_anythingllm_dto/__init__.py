@@ -1,15 +1,35 @@
 """Data Transfer Objects."""
 
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 
+from pydantic import TypeAdapter
+
 from sso_anythingllm_dto.api_key import ApiKeyDto
 from sso_anythingllm_dto.user import AnythingLLMUserDto, KeycloakUserDto
 
-# Read version from VERSION file
-version_file = Path(__file__).parents[2] / "VERSION"
-if not version_file.exists():
-    raise FileNotFoundError(f"VERSION file not found at {version_file}. Ensure the VERSION file exists in the package")
-__version__ = version_file.read_text().strip()
+# Validators/serializers for DTO lists at the API boundaries, built once at import instead of on every call.
+UserListAdapter: TypeAdapter[list[AnythingLLMUserDto]] = TypeAdapter(list[AnythingLLMUserDto])
+ApiKeyListAdapter: TypeAdapter[list[ApiKeyDto]] = TypeAdapter(list[ApiKeyDto])
+
+# Resolve the version from the installed distribution metadata; the VERSION file is only read when the package is
+# not installed (e.g. running straight from a source checkout).
+try:
+    __version__ = version("sso_anythingllm_dto")
+except PackageNotFoundError:
+    version_file = Path(__file__).parents[2] / "VERSION"
+    if not version_file.exists():
+        raise FileNotFoundError(
+            f"VERSION file not found at {version_file}. Ensure the VERSION file exists in the package"
+        )
+    __version__ = version_file.read_text().strip()
 
 
-__all__ = ["__version__", "ApiKeyDto", "AnythingLLMUserDto", "KeycloakUserDto"]
+__all__ = [
+    "__version__",
+    "ApiKeyDto",
+    "AnythingLLMUserDto",
+    "KeycloakUserDto",
+    "UserListAdapter",
+    "ApiKeyListAdapter",
+]
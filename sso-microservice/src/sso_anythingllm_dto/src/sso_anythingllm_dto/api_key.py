@@ -1,5 +1,7 @@
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
 
 
-class ApiKeyDto(BaseModel):
-    value: str = Field(description="Unique API key value")
+@dataclass(slots=True, frozen=True)
+class ApiKeyDto:
+    # Unique API key value
+    value: str
@@ -1,13 +1,14 @@
-from typing import Dict
+import sys
+from functools import lru_cache
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class KeycloakTokenConfig(BaseSettings):
-    model_config = SettingsConfigDict(env_prefix="KEYCLOAK_ANYTHING_LLM_", enable_decoding=False)
+    model_config = SettingsConfigDict(env_prefix="KEYCLOAK_ANYTHING_LLM_", enable_decoding=False, frozen=True)
 
-    group_correlations: Dict[str, str]
+    group_correlations: dict[str, str]
     # unique ID used for users in the keycloak token.
     id_claim: str
     # username property in the JWT token (preferred_username, for example).
@@ -17,7 +18,7 @@ class KeycloakTokenConfig(BaseSettings):
 
     @field_validator("group_correlations", mode="before")
     @classmethod
-    def decode_groups(cls, v: str) -> Dict[str, str]:
+    def decode_groups(cls, v: str) -> dict[str, str]:
         # Process a string-based array of key-value pairs using ; and , as separators:
         # expected format of the KEYCLOAK_ANYTING_LLM_GROUP_CORRELATIONS env var is (in one single line)
         # (there is a two line comment here due to compying with linting checks)
@@ -25,5 +26,20 @@ class KeycloakTokenConfig(BaseSettings):
         # keycloak_admin,admin;my_other_keycloak_group,manager;other_keycloak_group_default,default
         # Processing logic is:
         # Split by , to get the key->values pairs as a string.
-        # For each key->value pair string-based entry, split by ";" to get the value and the pair as different strings.
-        return {str(x.split(";")[0]): str(x.split(";")[1]) for x in v.split(",")}
+        # For each key->value pair string-based entry, partition by ";" to get the key and the value.
+        # Both are interned: the groups are matched against every incoming token and the roles are a closed set.
+        correlations: dict[str, str] = {}
+        if not v:
+            return correlations
+        for pair in v.split(","):
+            group, separator, role = pair.partition(";")
+            if not separator:
+                raise ValueError(f"Invalid group correlation entry '{pair}': expected '<group>;<role>'")
+            correlations[sys.intern(group)] = sys.intern(role)
+        return correlations
+
+
+@lru_cache(maxsize=1)
+def get_keycloak_config() -> KeycloakTokenConfig:
+    """Return the process-wide Keycloak configuration, reading and decoding the environment only once."""
+    return KeycloakTokenConfig()
@@ -1,14 +1,20 @@
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
 
 
-class KeycloakUserDto(BaseModel):
+@dataclass(slots=True, frozen=True)
+class KeycloakUserDto:
     id: str
     name: str
     groups: list[str]
 
 
-class AnythingLLMUserDto(BaseModel):
-    keycloak_id: str = Field(description="Unique identifier of an user in the Keycloak system.")
-    internal_id: int | None = Field(default=None, description="User's AnythingLLM internal ID.")
-    name: str = Field(description="User's name")
-    role: str | None = Field(default=None, description="AnythingLLM user's application role (admin|manager|default)")
+@dataclass(slots=True, frozen=True, kw_only=True)
+class AnythingLLMUserDto:
+    # Unique identifier of an user in the Keycloak system.
+    keycloak_id: str
+    # User's AnythingLLM internal ID.
+    internal_id: int | None = None
+    # User's name
+    name: str
+    # AnythingLLM user's application role (admin|manager|default)
+    role: str | None = None
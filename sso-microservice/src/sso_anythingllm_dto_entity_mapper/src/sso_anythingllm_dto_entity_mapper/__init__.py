@@ -1,15 +1,30 @@
 """DTO to Entity mapping."""
 
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 
-from sso_anythingllm_dto_entity_mapper.api_key import ApiKeyDTOEntityMapper
-from sso_anythingllm_dto_entity_mapper.user import AnythingLLMUserDTOEntityMapper
+from sso_anythingllm_dto_entity_mapper.api_key import ApiKeyDTOEntityMapper, api_key_from_entity, api_key_to_entity
+from sso_anythingllm_dto_entity_mapper.user import AnythingLLMUserDTOEntityMapper, user_from_entity, user_to_entity
 
-# Read version from VERSION file
-version_file = Path(__file__).parents[2] / "VERSION"
-if not version_file.exists():
-    raise FileNotFoundError(f"VERSION file not found at {version_file}. Ensure the VERSION file exists in the package")
-__version__ = version_file.read_text().strip()
+# Resolve the version from the installed distribution metadata; the VERSION file is only read when the package is
+# not installed (e.g. running straight from a source checkout).
+try:
+    __version__ = version("sso_anythingllm_dto_entity_mapper")
+except PackageNotFoundError:
+    version_file = Path(__file__).parents[2] / "VERSION"
+    if not version_file.exists():
+        raise FileNotFoundError(
+            f"VERSION file not found at {version_file}. Ensure the VERSION file exists in the package"
+        )
+    __version__ = version_file.read_text().strip()
 
 
-__all__ = ["__version__", "ApiKeyDTOEntityMapper", "AnythingLLMUserDTOEntityMapper"]
+__all__ = [
+    "__version__",
+    "ApiKeyDTOEntityMapper",
+    "AnythingLLMUserDTOEntityMapper",
+    "api_key_from_entity",
+    "api_key_to_entity",
+    "user_from_entity",
+    "user_to_entity",
+]
@@ -1,3 +1,5 @@
+from collections.abc import Iterable
+
 from sso_anythingllm_dto.api_key import ApiKeyDto
 from sso_anythingllm_entity.api_key import ApiKey
 
@@ -5,12 +7,34 @@ from sso_anythingllm_entity.api_key import ApiKey
 class ApiKeyDTOEntityMapper:
     """Mapper for ApiKey that includes property templates in the mapping."""
 
-    def from_target(self, target: ApiKey) -> ApiKeyDto:
+    __slots__: tuple[str, ...] = ()
+
+    # The DTO/entity classes are bound as default arguments so each call reads a local instead of a module global.
+    @staticmethod
+    def from_target(target: ApiKey, _dto_class: type[ApiKeyDto] = ApiKeyDto) -> ApiKeyDto:
         """Convert ApiKey entity to DTO."""
-        dto = ApiKeyDto(value=target.value)
+        dto = _dto_class(value=target.value)
         return dto
 
-    def to_target(self, source: ApiKeyDto) -> ApiKey:
+    @staticmethod
+    def to_target(source: ApiKeyDto, _entity_class: type[ApiKey] = ApiKey) -> ApiKey:
         """Convert DTO to ApiKey entity."""
-        entity = ApiKey(value=source.value)
+        entity = _entity_class(value=source.value)
         return entity
+
+    @staticmethod
+    def from_targets(targets: Iterable[ApiKey]) -> list[ApiKeyDto]:
+        """Convert a batch of ApiKey entities to DTOs."""
+        dto_class = ApiKeyDto
+        return [dto_class(value=t.value) for t in targets]
+
+    @staticmethod
+    def to_targets(sources: Iterable[ApiKeyDto]) -> list[ApiKey]:
+        """Convert a batch of DTOs to ApiKey entities."""
+        entity_class = ApiKey
+        return [entity_class(value=s.value) for s in sources]
+
+
+# Module-level aliases so hot paths can bind the mapping functions directly, skipping the class attribute lookup.
+api_key_from_entity = ApiKeyDTOEntityMapper.from_target
+api_key_to_entity = ApiKeyDTOEntityMapper.to_target
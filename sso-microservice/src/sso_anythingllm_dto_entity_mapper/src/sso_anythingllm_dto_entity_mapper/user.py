@@ -1,3 +1,5 @@
+from collections.abc import Iterable
+
 from sso_anythingllm_dto.user import AnythingLLMUserDto
 from sso_anythingllm_entity.user import User
 
@@ -5,13 +7,60 @@ from sso_anythingllm_entity.user import User
 class AnythingLLMUserDTOEntityMapper:
     """Mapper for ModelTemplate that includes property templates in the mapping."""
 
-    def from_target(self, target: User) -> AnythingLLMUserDto:
+    __slots__: tuple[str, ...] = ()
+
+    # The DTO/entity classes are bound as default arguments so each call reads a local instead of a module global.
+    @staticmethod
+    def from_target(target: User, _dto_class: type[AnythingLLMUserDto] = AnythingLLMUserDto) -> AnythingLLMUserDto:
         """Convert ModelTemplate entity to DTO including property templates."""
-        dto = AnythingLLMUserDto(
+        dto = _dto_class(
             keycloak_id=target.keycloak_id, name=target.name, internal_id=target.internal_id, role=target.role
         )
         return dto
 
-    def to_target(self, source: AnythingLLMUserDto) -> User:
-        dto = User(keycloak_id=source.keycloak_id, name=source.name, internal_id=source.internal_id, role=source.role)
+    @staticmethod
+    def to_target(source: AnythingLLMUserDto, _entity_class: type[User] = User) -> User:
+        dto = _entity_class(
+            keycloak_id=source.keycloak_id, name=source.name, internal_id=source.internal_id, role=source.role
+        )
         return dto
+
+    @staticmethod
+    def from_targets(targets: Iterable[User]) -> list[AnythingLLMUserDto]:
+        """Convert a batch of User entities to DTOs."""
+        dto_class = AnythingLLMUserDto
+        return [
+            dto_class(keycloak_id=t.keycloak_id, name=t.name, internal_id=t.internal_id, role=t.role) for t in targets
+        ]
+
+    @staticmethod
+    def from_targets_cached(targets: Iterable[User]) -> list[AnythingLLMUserDto]:
+        """Convert a batch of User entities to DTOs, mapping each Keycloak user only once.
+
+        Meant for joined result sets where the same row shows up repeatedly: the returned list shares one DTO per
+        keycloak_id. The memo only lives for the duration of the call, so it never serves stale data.
+        """
+        dto_class = AnythingLLMUserDto
+        seen: dict[str, AnythingLLMUserDto] = {}
+        out: list[AnythingLLMUserDto] = []
+        for t in targets:
+            dto = seen.get(t.keycloak_id)
+            if dto is None:
+                dto = dto_class(keycloak_id=t.keycloak_id, name=t.name, internal_id=t.internal_id, role=t.role)
+                seen[t.keycloak_id] = dto
+            out.append(dto)
+        return out
+
+    @staticmethod
+    def to_targets(sources: Iterable[AnythingLLMUserDto]) -> list[User]:
+        """Convert a batch of DTOs to User entities."""
+        entity_class = User
+        return [
+            entity_class(keycloak_id=s.keycloak_id, name=s.name, internal_id=s.internal_id, role=s.role)
+            for s in sources
+        ]
+
+
+# Module-level aliases so hot paths can bind the mapping functions directly, skipping the class attribute lookup.
+user_from_entity = AnythingLLMUserDTOEntityMapper.from_target
+user_to_entity = AnythingLLMUserDTOEntityMapper.to_target
@@ -1,15 +1,34 @@
+from collections.abc import Callable, Sequence
+from dataclasses import fields
+from operator import attrgetter, itemgetter
+
 from kink import inject
+from pydantic import TypeAdapter
 
 from sso_anythingllm_dto.config.keycloak import KeycloakTokenConfig
 from sso_anythingllm_dto.user import AnythingLLMUserDto
 
+# The JWT claims are the only untrusted input reaching the DTOs, so they are validated here rather than on every
+# DTO construction.
+_user_adapter: TypeAdapter[AnythingLLMUserDto] = TypeAdapter(AnythingLLMUserDto)
+
+# AnythingLLMUserDto is flat, so its fields are read with one attrgetter call instead of the recursive asdict().
+_USER_FIELDS: tuple[str, ...] = tuple(field.name for field in fields(AnythingLLMUserDto))
+_get_user_fields = attrgetter(*_USER_FIELDS)
+
 
 class AnythingLLMUserDtoToMapper:
     """Maps ModelPropertyInstanceDto to PropertyValueTo for REST API responses."""
 
+    __slots__ = ("keycloak_config", "from_target")
+
+    # Built per instance by _build_from_target, specialised on the injected configuration.
+    from_target: Callable[[dict], AnythingLLMUserDto]
+
     @inject
     def __init__(self, keycloak_config: KeycloakTokenConfig):
         self.keycloak_config = keycloak_config
+        self.from_target = self._build_from_target(keycloak_config)
 
     def to_target(self, origin: AnythingLLMUserDto) -> dict:
         """Convert AnythingLLMUserDto tio dict based key-values properties.
@@ -17,18 +36,40 @@ class AnythingLLMUserDtoToMapper:
         Raises:
             ValueError: If properties can't be provided as dict
         """
-        return origin.model_dump()
-
-    def from_target(self, target: dict) -> AnythingLLMUserDto:
-        """Convert dict based key-values properties to AnythingLLMUserDto."""
-        role: str | None = None
-        for value in target[self.keycloak_config.group_claim]:
-            if value in self.keycloak_config.group_correlations.keys():
-                role = self.keycloak_config.group_correlations[value]
-
-        user_dto: AnythingLLMUserDto = AnythingLLMUserDto(
-            name=target[self.keycloak_config.username_claim],
-            keycloak_id=target[self.keycloak_config.id_claim],
-            role=role,
+        return dict(zip(_USER_FIELDS, _get_user_fields(origin)))
+
+    def to_target_many(self, origins: Sequence[AnythingLLMUserDto]) -> list[dict]:
+        """Convert a batch of AnythingLLMUserDto to dict based key-values properties."""
+        user_fields = _USER_FIELDS
+        get_user_fields = _get_user_fields
+        return [dict(zip(user_fields, get_user_fields(origin))) for origin in origins]
+
+    @staticmethod
+    def _build_from_target(keycloak_config: KeycloakTokenConfig) -> Callable[[dict], AnythingLLMUserDto]:
+        """Build the dict -> AnythingLLMUserDto conversion with the claim names and group correlations bound as
+        closure locals, since the configuration never changes once injected."""
+        # One C-level call extracts every claim the mapping needs.
+        extract_claims = itemgetter(
+            keycloak_config.id_claim, keycloak_config.username_claim, keycloak_config.group_claim
         )
-        return user_dto
+        group_correlations = keycloak_config.group_correlations
+        validate = _user_adapter.validate_python
+
+        def from_target(target: dict) -> AnythingLLMUserDto:
+            """Convert dict based key-values properties to AnythingLLMUserDto."""
+            keycloak_id, name, groups = extract_claims(target)
+            role: str | None = None
+            for value in groups:
+                if value in group_correlations:
+                    role = group_correlations[value]
+
+            user_dto: AnythingLLMUserDto = validate(
+                {
+                    "name": name,
+                    "keycloak_id": keycloak_id,
+                    "role": role,
+                }
+            )
+            return user_dto
+
+        return from_target
@@ -1,16 +1,31 @@
 """Facade layer."""
 
 # Import facade implementations
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 
 from sso_anythingllm_facade.interfaces.sso_facade_interface import SSOFacadeInterface
 from sso_anythingllm_facade.sso_facade import SSOFacade
 
-# Read version from VERSION file
-version_file = Path(__file__).parents[2] / "VERSION"
-if not version_file.exists():
-    raise FileNotFoundError(f"VERSION file not found at {version_file}. Ensure the VERSION file exists in the package")
-__version__ = version_file.read_text().strip()
+
+def __getattr__(name: str) -> str:
+    """Resolve ``__version__`` on first access (PEP 562) instead of at import time.
+
+    The installed distribution metadata is used; the VERSION file is only read when the package is not installed.
+    """
+    if name == "__version__":
+        try:
+            package_version = version("sso_anythingllm_facade")
+        except PackageNotFoundError:
+            version_file = Path(__file__).parents[2] / "VERSION"
+            if not version_file.exists():
+                raise FileNotFoundError(
+                    f"VERSION file not found at {version_file}. Ensure the VERSION file exists in the package"
+                )
+            package_version = version_file.read_text().strip()
+        globals()["__version__"] = package_version
+        return package_version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = [
@@ -6,6 +6,9 @@ from typing import Dict, Protocol
 class SSOFacadeInterface(Protocol):
     """Facade for managing all SSO use-case operations."""
 
+    # Empty slots so implementations declaring their own __slots__ do not get a __dict__ from this base.
+    __slots__ = ()
+
     async def get_anything_llm_sso_url(self, user: Dict) -> str:
         """
         Get user's SSO temporal URL by User information on Keycloak.
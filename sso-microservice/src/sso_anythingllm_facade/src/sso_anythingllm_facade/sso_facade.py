@@ -1,20 +1,40 @@
 """Model instance facade module for orchestrating model instance operations."""
 
-from typing import Dict, List
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import replace
+from typing import Dict
 
-from kink import di, inject
+from kink import inject
 
 from sso_anythingllm_dto import ApiKeyDto
 from sso_anythingllm_dto.config.keycloak import KeycloakTokenConfig
 from sso_anythingllm_dto.user import AnythingLLMUserDto
-from sso_anythingllm_dto_to_mapper.user_mapper import AnythingLLMUserDtoToMapper
+from sso_anythingllm_dto_to_mapper import AnythingLLMUserDtoToMapper
 from sso_anythingllm_facade.interfaces import SSOFacadeInterface
-from sso_anythingllm_repository import ValidationError
+from sso_anythingllm_repository import NetworkError, ValidationError
 from sso_anythingllm_service.interfaces.api_key_service_interface import ApiKeyServiceInterface
 from sso_anythingllm_service.interfaces.auth_service_interface import AuthServiceInterface
 from sso_anythingllm_service.interfaces.sso_service_interface import SSOServiceInterface
 from sso_anythingllm_service.interfaces.user_service_interface import UserServiceInterface
 
+# Users stored in the local database are remembered for this many seconds, so repeated logins skip the lookup.
+USER_CACHE_TTL_SECONDS: float = 30.0
+# Upper bound of cached users, the least recently used ones are evicted first.
+USER_CACHE_MAX_SIZE: int = 10_000
+# Window (seconds) during which concurrent database lookups of different users are collected into one query.
+USER_BATCH_WINDOW_SECONDS: float = 0.005
+# Maximum seconds to wait for AnythingLLM to issue an SSO URL. SSOService does not retry this call, so the whole
+# budget goes to a single attempt.
+SSO_URL_TIMEOUT_SECONDS: float = 3.0
+# After this many SSO URL failures (timeouts, network errors, 5xx) within the window, requests fail fast for the reset
+# timeout (seconds).
+SSO_URL_FAILURE_THRESHOLD: int = 5
+SSO_URL_FAILURE_WINDOW_SECONDS: float = 10.0
+SSO_URL_RESET_TIMEOUT_SECONDS: float = 30.0
+
 
 class NotAuthorizedException(Exception):
     message: str | None
@@ -23,27 +43,215 @@ class NotAuthorizedException(Exception):
         self.message = message
 
 
+class AnythingLLMUnavailableException(Exception):
+    message: str | None
+
+    def __init__(self, message: str | None = None):
+        self.message = message
+
+
+class _CircuitBreaker:
+    """Fails fast once a dependency has failed repeatedly, until a cool-down period has passed."""
+
+    __slots__ = ("failure_threshold", "failure_window", "reset_timeout", "_failures", "_opened_at")
+
+    def __init__(self, failure_threshold: int, failure_window: float, reset_timeout: float):
+        """
+        Args:
+            failure_threshold: Number of failures that opens the circuit.
+            failure_window: Seconds within which the failures have to happen to be counted together.
+            reset_timeout: Seconds the circuit stays open before calls are let through again.
+        """
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.reset_timeout = reset_timeout
+        self._failures: deque[float] = deque()
+        self._opened_at: float | None = None
+
+    def is_open(self) -> bool:
+        if self._opened_at is None:
+            return False
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            # Cool-down is over: let calls through again, a new series of failures will open it back.
+            self._opened_at = None
+            self._failures.clear()
+            return False
+        return True
+
+    def record_success(self) -> None:
+        self._failures.clear()
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        self._failures.append(now)
+        while now - self._failures[0] > self.failure_window:
+            self._failures.popleft()
+        if len(self._failures) >= self.failure_threshold:
+            self._opened_at = now
+
+
+class _UserBatcher:
+    """Coalesces the database lookups of users requested within a short window into a single query."""
+
+    __slots__ = ("user_service", "window", "_pending", "_flush_task", "_running_flushes")
+
+    def __init__(self, user_service: UserServiceInterface, window: float):
+        self.user_service = user_service
+        self.window = window
+        self._pending: Dict[str, list[asyncio.Future[AnythingLLMUserDto | None]]] = {}
+        self._flush_task: asyncio.Task[None] | None = None
+        # Strong references to the flushes whose query is still running, so they are not garbage collected.
+        self._running_flushes: set[asyncio.Task[None]] = set()
+
+    async def get(self, keycloak_id: str) -> AnythingLLMUserDto | None:
+        """Return the stored user with this Keycloak ID, or None if there is none."""
+        future: asyncio.Future[AnythingLLMUserDto | None] = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(keycloak_id, []).append(future)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+            self._running_flushes.add(self._flush_task)
+            self._flush_task.add_done_callback(self._running_flushes.discard)
+        return await future
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self.window)
+        # Requests arriving from now on start a new batch.
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+        try:
+            users = await self.user_service.get_users_by_keycloak_ids(list(pending))
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for keycloak_id, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(users.get(keycloak_id))
+
+
 @inject(alias=SSOFacadeInterface)
 class SSOFacade(SSOFacadeInterface):
     """Facade for orchestrating SSO use-case operations."""
 
+    __slots__ = (
+        "sso_service",
+        "user_service",
+        "api_key_service",
+        "auth_service",
+        "logger",
+        "_user_mapper",
+        "_api_key",
+        "_api_key_lock",
+        "_user_cache",
+        "_sso_url_breaker",
+        "_user_batcher",
+        "_inflight",
+    )
+
     def __init__(
         self,
         sso_service: SSOServiceInterface,
         user_service: UserServiceInterface,
         api_key_service: ApiKeyServiceInterface,
         auth_service: AuthServiceInterface,
+        keycloak_config: KeycloakTokenConfig,
     ):
         """Initialize the ModelInstanceFacade with required service.
 
         Args:
             sso_service: Service for sso related operations
             user_service: Service for user-related operations
+            keycloak_config: Keycloak token configuration used to map the incoming users
         """
         self.sso_service = sso_service
         self.user_service = user_service
         self.api_key_service = api_key_service
         self.auth_service = auth_service
+        self.logger = logging.getLogger(__name__)
+        self._user_mapper = AnythingLLMUserDtoToMapper(keycloak_config=keycloak_config)
+        # AnythingLLM's admin API key barely ever changes, so it is resolved once and kept for the process lifetime.
+        self._api_key: ApiKeyDto | None = None
+        self._api_key_lock = asyncio.Lock()
+        # Recently seen database users by Keycloak ID, with the monotonic time they were cached at.
+        self._user_cache: OrderedDict[str, tuple[float, AnythingLLMUserDto]] = OrderedDict()
+        self._sso_url_breaker = _CircuitBreaker(
+            failure_threshold=SSO_URL_FAILURE_THRESHOLD,
+            failure_window=SSO_URL_FAILURE_WINDOW_SECONDS,
+            reset_timeout=SSO_URL_RESET_TIMEOUT_SECONDS,
+        )
+        self._user_batcher = _UserBatcher(user_service=user_service, window=USER_BATCH_WINDOW_SECONDS)
+        # SSO URL orchestrations currently running, by Keycloak ID.
+        self._inflight: Dict[str, asyncio.Future[str]] = {}
+
+    async def _get_or_create_api_key(self) -> ApiKeyDto:
+        """Return the cached AnythingLLM API key, loading it from the database (or generating it) on first use."""
+        if self._api_key is not None:
+            return self._api_key
+        async with self._api_key_lock:
+            # Another request may have resolved the key while this one was waiting for the lock.
+            if self._api_key is None:
+                # Only one key is ever used, so there is no need to load all of them.
+                api_key: ApiKeyDto | None = await self.api_key_service.get_first_api_key()
+                if api_key is None:
+                    # Get auth token for the user.
+                    auth_token: str = await self.auth_service.obtain_auth_token_for_admin()
+                    api_key = await self.api_key_service.generate_new_api_key(auth_token=auth_token)
+                    await self.api_key_service.create(api_key=api_key)
+                self._api_key = api_key
+        return self._api_key
+
+    def _cache_user(self, user: AnythingLLMUserDto) -> None:
+        """Remember a user as stored in the local database."""
+        self._user_cache[user.keycloak_id] = (time.monotonic(), user)
+        self._user_cache.move_to_end(user.keycloak_id)
+        if len(self._user_cache) > USER_CACHE_MAX_SIZE:
+            self._user_cache.popitem(last=False)
+
+    async def _get_db_user(self, keycloak_id: str, role: str | None) -> AnythingLLMUserDto | None:
+        """Return the user stored in the local database, or None if there is none.
+
+        A recently cached user is returned without querying the database, as long as its role still matches the
+        incoming one: a role change always goes to the database so it can be synchronised.
+        """
+        entry = self._user_cache.get(keycloak_id)
+        if entry is not None:
+            cached_at, cached_user = entry
+            if time.monotonic() - cached_at < USER_CACHE_TTL_SECONDS and cached_user.role == role:
+                self._user_cache.move_to_end(keycloak_id)
+                return cached_user
+        try:
+            db_user = await self._user_batcher.get(keycloak_id)
+        except ValidationError:
+            return None
+        if db_user is not None:
+            self._cache_user(db_user)
+        return db_user
+
+    async def _get_sso_url(self, anything_llm_user_id: int, api_key: str) -> str:
+        """Get the SSO URL from AnythingLLM, bounded by a timeout and guarded by a circuit breaker so a slow or down
+        AnythingLLM does not keep every SSO request hanging.
+
+        Only unavailability (timeouts, network errors and 5xx responses, which the repository raises as NetworkError)
+        counts towards opening the circuit; business errors such as an authentication failure are re-raised as is.
+        """
+        if self._sso_url_breaker.is_open():
+            raise AnythingLLMUnavailableException(message="AnythingLLM is not available at the moment.")
+        try:
+            url: str = await asyncio.wait_for(
+                self.sso_service.get_sso_url_for_user(anything_llm_user_id=anything_llm_user_id, api_key=api_key),
+                timeout=SSO_URL_TIMEOUT_SECONDS,
+            )
+        except TimeoutError as e:
+            self._sso_url_breaker.record_failure()
+            raise AnythingLLMUnavailableException(message="AnythingLLM did not provide the SSO URL in time.") from e
+        except NetworkError:
+            self._sso_url_breaker.record_failure()
+            raise
+        self._sso_url_breaker.record_success()
+        return url
 
     async def get_anything_llm_sso_url(self, user: Dict) -> str:
         """
@@ -55,49 +263,92 @@ class SSOFacade(SSOFacadeInterface):
         Returns:
             str: AnythingLLM's temporarily access URL by its simple SSO integration.
         """
-        # Get or generate AnythingLLM's API KEY
-        keys: List[ApiKeyDto] = await self.api_key_service.get_all_api_keys()
-        if keys and len(keys) > 0:
-            api_key: ApiKeyDto = keys[0]
-        else:
-            # Get auth token for the user.
-            auth_token: str = await self.auth_service.obtain_auth_token_for_admin()
-            api_key: ApiKeyDto = await self.api_key_service.generate_new_api_key(auth_token=auth_token)
-            await self.api_key_service.create(api_key=api_key)
-
-        # Map user dict to AnythingLLMUserDto
-        incoming_user: AnythingLLMUserDto = AnythingLLMUserDtoToMapper(
-            keycloak_config=di[KeycloakTokenConfig]
-        ).from_target(target=user)
+        # Map user dict to AnythingLLMUserDto. It runs inline on the event loop: it is a handful of dict lookups plus
+        # a small pydantic validation (~2 µs per token). Offload it with asyncio.to_thread only if it ever gets over
+        # ~50 µs, e.g. if the mapper starts parsing or matching the claims with regular expressions.
+        incoming_user: AnythingLLMUserDto = self._user_mapper.from_target(target=user)
 
+        # Reject users without a mapped role before any API key, database or AnythingLLM work is done for them.
         if not incoming_user.role:
             raise NotAuthorizedException(message="User is not authorized to access the AnythingLLM platform.")
 
-        # Check if user exist on local database
-        db_user: AnythingLLMUserDto | None = None
+        # Concurrent requests for the same user (refresh storms, several tabs) wait for the orchestration already in
+        # progress instead of running their own, which would repeat the same creations/updates.
+        keycloak_id: str = incoming_user.keycloak_id
+        inflight: asyncio.Future[str] | None = self._inflight.get(keycloak_id)
+        if inflight is not None:
+            # Shielded, so a waiter whose request is cancelled does not cancel the orchestration the others wait for.
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._inflight[keycloak_id] = future
         try:
-            db_user = await self.user_service.get_user_by_keycloak_id(keycloak_id=incoming_user.keycloak_id)
-        except ValidationError:
-            pass
+            url: str = await self._resolve_sso_url(incoming_user=incoming_user)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            if not future.done():
+                future.set_exception(error)
+                # Mark the exception as retrieved, there may be no other request waiting for it.
+                future.exception()
+            raise
+        else:
+            if not future.done():
+                future.set_result(url)
+            return url
+        finally:
+            del self._inflight[keycloak_id]
+
+    async def _resolve_sso_url(self, incoming_user: AnythingLLMUserDto) -> str:
+        """Run the SSO orchestration for an already mapped user and return its temporal access URL."""
+        # Get or generate AnythingLLM's API KEY and check if user exist on local database, both lookups are independent.
+        api_key: ApiKeyDto
+        db_user: AnythingLLMUserDto | None
+        api_key, db_user = await asyncio.gather(
+            self._get_or_create_api_key(),
+            self._get_db_user(keycloak_id=incoming_user.keycloak_id, role=incoming_user.role),
+        )
 
         if db_user is None:
             # Create the user in AnythingLLM's side, using the API Rest
             anything_llm_user_id: int = await self.user_service.create_user_in_anything_llm(
                 user=incoming_user, api_key=api_key.value
             )
-            incoming_user.internal_id = anything_llm_user_id
-            # If user doesn't exist, create the user at database level.
-            processed_user: AnythingLLMUserDto = await self.user_service.save(user=incoming_user)
+            incoming_user = replace(incoming_user, internal_id=anything_llm_user_id)
+            # If user doesn't exist, create the user at database level. The SSO URL only needs the AnythingLLM ID, so
+            # it is requested at the same time; if the save fails the URL is discarded and the next request retries.
+            # An upsert is used so a concurrent login of the same user on another replica does not make the write fail.
+            processed_user: AnythingLLMUserDto
+            url: str
+            processed_user, url = await asyncio.gather(
+                self.user_service.upsert(user=incoming_user),
+                self._get_sso_url(anything_llm_user_id=anything_llm_user_id, api_key=api_key.value),
+            )
+            self._cache_user(processed_user)
+            return url
         else:
             # If user does exist, check that the groups coming from keycloak
             # and the groups at database level are consistent.
             # we assume there is no local modification made manually at AnythingLLM's side, performed by admin users
             # if this assumption changes, this business logic needs to be aligned.
             if db_user.role != incoming_user.role:
-                # Update at API level.
-                db_user.role = incoming_user.role
-                processed_user: AnythingLLMUserDto = await self.user_service.update(user=db_user)
-                await self.user_service.update_user_in_anything_llm(user=db_user, api_key=api_key.value)
+                # Update at database and API level, both writes are independent. If either fails the role mismatch
+                # is still there on the next SSO request, which reconciles both sides again.
+                self._user_cache.pop(db_user.keycloak_id, None)
+                db_user = replace(db_user, role=incoming_user.role)
+                processed_user: AnythingLLMUserDto
+                try:
+                    processed_user, _ = await asyncio.gather(
+                        self.user_service.upsert(user=db_user),
+                        self.user_service.update_user_in_anything_llm(user=db_user, api_key=api_key.value),
+                    )
+                except Exception as e:
+                    self.logger.error(
+                        "Error synchronising role of user with keycloak_id '%s': %s", db_user.keycloak_id, e
+                    )
+                    raise
+                self._cache_user(processed_user)
             else:
                 processed_user: AnythingLLMUserDto = db_user
 
@@ -105,6 +356,4 @@ class SSOFacade(SSOFacadeInterface):
             raise ValueError(
                 "Business logic error, the user should always have an internal AnythingLLM identifier here."
             )
-        return await self.sso_service.get_sso_url_for_user(
-            anything_llm_user_id=int(processed_user.internal_id), api_key=api_key.value
-        )
+        return await self._get_sso_url(anything_llm_user_id=int(processed_user.internal_id), api_key=api_key.value)
@@ -0,0 +1,221 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from sso_anythingllm_dto import AnythingLLMUserDto, ApiKeyDto
+from sso_anythingllm_dto.config.keycloak import KeycloakTokenConfig
+from sso_anythingllm_facade.sso_facade import (
+    SSO_URL_FAILURE_THRESHOLD,
+    SSO_URL_RESET_TIMEOUT_SECONDS,
+    AnythingLLMUnavailableException,
+    SSOFacade,
+)
+from sso_anythingllm_repository import AuthenticationError, NetworkError
+
+SSO_URL = "https://llm.example.com/sso/simple?token=abc"
+
+
+def keycloak_user(keycloak_id: str = "keycloak-id-1", groups: list[str] | None = None) -> dict:
+    """Build the claims of a Keycloak token as the REST layer passes them to the facade."""
+    return {"sub": keycloak_id, "preferred_username": "john", "groups": ["llm_admin"] if groups is None else groups}
+
+
+def stored_user(role: str = "admin") -> AnythingLLMUserDto:
+    """Build the user stored in the local database for the default Keycloak token."""
+    return AnythingLLMUserDto(keycloak_id="keycloak-id-1", name="john", internal_id=3, role=role)
+
+
+class TestSSOFacade:
+    """Test cases for SSOFacade."""
+
+    @pytest.fixture
+    def keycloak_config(self):
+        """Keycloak configuration mapping two groups to AnythingLLM roles."""
+        return KeycloakTokenConfig(
+            group_correlations="llm_admin;admin,llm_default;default",
+            id_claim="sub",
+            username_claim="preferred_username",
+            group_claim="groups",
+        )
+
+    @pytest.fixture
+    def sso_service(self):
+        """Mock SSO service returning a fixed SSO URL."""
+        service = AsyncMock()
+        service.get_sso_url_for_user.return_value = SSO_URL
+        return service
+
+    @pytest.fixture
+    def user_service(self):
+        """Mock user service without stored users, creating users in AnythingLLM with ID 7."""
+        service = AsyncMock()
+        service.get_users_by_keycloak_ids.return_value = {}
+        service.create_user_in_anything_llm.return_value = 7
+        service.upsert.side_effect = lambda user: user
+        return service
+
+    @pytest.fixture
+    def api_key_service(self):
+        """Mock API key service with a stored API key."""
+        service = AsyncMock()
+        service.get_first_api_key.return_value = ApiKeyDto(value="api-key")
+        return service
+
+    @pytest.fixture
+    def facade(self, sso_service, user_service, api_key_service, keycloak_config):
+        """Create SSOFacade instance with mocked services."""
+        return SSOFacade(
+            sso_service=sso_service,
+            user_service=user_service,
+            api_key_service=api_key_service,
+            auth_service=AsyncMock(),
+            keycloak_config=keycloak_config,
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_orchestration(self, facade, sso_service, user_service):
+        """Test concurrent SSO requests of the same user run the AnythingLLM calls only once."""
+
+        async def create_user(**_):
+            await asyncio.sleep(0.01)
+            return 7
+
+        user_service.create_user_in_anything_llm.side_effect = create_user
+
+        # Execute
+        urls = await asyncio.gather(*(facade.get_anything_llm_sso_url(keycloak_user()) for _ in range(5)))
+
+        # Assertions
+        assert urls == [SSO_URL] * 5
+        user_service.create_user_in_anything_llm.assert_awaited_once()
+        sso_service.get_sso_url_for_user.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_break_leader(self, facade, user_service):
+        """Test cancelling a request waiting on another one leaves that orchestration and its other waiters intact."""
+        release = asyncio.Event()
+
+        async def create_user(**_):
+            await release.wait()
+            return 7
+
+        user_service.create_user_in_anything_llm.side_effect = create_user
+
+        leader = asyncio.create_task(facade.get_anything_llm_sso_url(keycloak_user()))
+        await asyncio.sleep(0)
+        cancelled_waiter = asyncio.create_task(facade.get_anything_llm_sso_url(keycloak_user()))
+        waiter = asyncio.create_task(facade.get_anything_llm_sso_url(keycloak_user()))
+        await asyncio.sleep(0)
+
+        # Execute
+        cancelled_waiter.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        # Assertions
+        assert await leader == SSO_URL
+        assert await waiter == SSO_URL
+        assert cancelled_waiter.cancelled()
+        user_service.create_user_in_anything_llm.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stored_user_is_cached(self, facade, sso_service, user_service):
+        """Test repeated logins of a stored user with an unchanged role skip the database lookup."""
+        user_service.get_users_by_keycloak_ids.return_value = {"keycloak-id-1": stored_user()}
+
+        # Execute
+        first_url = await facade.get_anything_llm_sso_url(keycloak_user())
+        second_url = await facade.get_anything_llm_sso_url(keycloak_user())
+
+        # Assertions
+        assert first_url == second_url == SSO_URL
+        user_service.get_users_by_keycloak_ids.assert_awaited_once_with(["keycloak-id-1"])
+        user_service.create_user_in_anything_llm.assert_not_awaited()
+        user_service.upsert.assert_not_awaited()
+        assert sso_service.get_sso_url_for_user.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_role_change_bypasses_and_refreshes_cache(self, facade, user_service):
+        """Test a login with a new role goes to the database, synchronises the role and caches the updated user."""
+        user_service.get_users_by_keycloak_ids.return_value = {"keycloak-id-1": stored_user()}
+        await facade.get_anything_llm_sso_url(keycloak_user())
+
+        # Execute
+        await facade.get_anything_llm_sso_url(keycloak_user(groups=["llm_default"]))
+        await facade.get_anything_llm_sso_url(keycloak_user(groups=["llm_default"]))
+
+        # Assertions
+        assert user_service.get_users_by_keycloak_ids.await_count == 2
+        user_service.upsert.assert_awaited_once_with(user=stored_user(role="default"))
+        user_service.update_user_in_anything_llm.assert_awaited_once_with(
+            user=stored_user(role="default"), api_key="api-key"
+        )
+
+    @pytest.mark.asyncio
+    async def test_api_key_is_resolved_once(self, facade, api_key_service):
+        """Test concurrent and later requests of different users share a single API key lookup."""
+
+        async def get_first_api_key():
+            await asyncio.sleep(0.01)
+            return ApiKeyDto(value="api-key")
+
+        api_key_service.get_first_api_key.side_effect = get_first_api_key
+
+        # Execute
+        await asyncio.gather(*(facade.get_anything_llm_sso_url(keycloak_user(f"keycloak-id-{i}")) for i in range(3)))
+        await facade.get_anything_llm_sso_url(keycloak_user("keycloak-id-4"))
+
+        # Assertions
+        api_key_service.get_first_api_key.assert_awaited_once()
+        api_key_service.generate_new_api_key.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_circuit_opens_after_failures_and_resets_after_cooldown(self, facade, sso_service, user_service):
+        """Test repeated network errors open the circuit, which lets requests through again after the cool-down."""
+        user_service.get_users_by_keycloak_ids.return_value = {"keycloak-id-1": stored_user()}
+        sso_service.get_sso_url_for_user.side_effect = NetworkError("Server error after 0 retries")
+        clock = [1000.0]
+
+        with patch("sso_anythingllm_facade.sso_facade.time.monotonic", side_effect=lambda: clock[0]):
+            for _ in range(SSO_URL_FAILURE_THRESHOLD):
+                with pytest.raises(NetworkError):
+                    await facade.get_anything_llm_sso_url(keycloak_user())
+
+            # Open: AnythingLLM is not called at all
+            with pytest.raises(AnythingLLMUnavailableException):
+                await facade.get_anything_llm_sso_url(keycloak_user())
+            assert sso_service.get_sso_url_for_user.await_count == SSO_URL_FAILURE_THRESHOLD
+
+            # Cool-down over: the next request reaches AnythingLLM again
+            clock[0] += SSO_URL_RESET_TIMEOUT_SECONDS
+            sso_service.get_sso_url_for_user.side_effect = None
+            assert await facade.get_anything_llm_sso_url(keycloak_user()) == SSO_URL
+
+    @pytest.mark.asyncio
+    async def test_business_errors_do_not_open_circuit(self, facade, sso_service, user_service):
+        """Test errors other than unavailability are re-raised without counting towards the circuit breaker."""
+        user_service.get_users_by_keycloak_ids.return_value = {"keycloak-id-1": stored_user()}
+        sso_service.get_sso_url_for_user.side_effect = AuthenticationError("Authentication failed")
+
+        for _ in range(SSO_URL_FAILURE_THRESHOLD + 1):
+            with pytest.raises(AuthenticationError):
+                await facade.get_anything_llm_sso_url(keycloak_user())
+
+        # Assertions
+        assert sso_service.get_sso_url_for_user.await_count == SSO_URL_FAILURE_THRESHOLD + 1
+
+    @pytest.mark.asyncio
+    async def test_sso_url_timeout_counts_as_unavailable(self, facade, sso_service, user_service):
+        """Test a timed out SSO URL request is reported as AnythingLLM being unavailable."""
+        user_service.get_users_by_keycloak_ids.return_value = {"keycloak-id-1": stored_user()}
+
+        async def hang(**_):
+            await asyncio.sleep(1)
+
+        sso_service.get_sso_url_for_user.side_effect = hang
+
+        with patch("sso_anythingllm_facade.sso_facade.SSO_URL_TIMEOUT_SECONDS", 0.01):
+            with pytest.raises(AnythingLLMUnavailableException):
+                await facade.get_anything_llm_sso_url(keycloak_user())
+        assert len(facade._sso_url_breaker._failures) == 1
@@ -12,6 +12,8 @@ from sso_anythingllm_repository.anything_llm_repository import AnythingLLMReposi
 from sso_anythingllm_repository.config import AnythingLLMConfig
 from sso_anythingllm_repository.exceptions import AnythingLLMRepositoryError, AuthenticationError, NetworkError
 
+logger = logging.getLogger(__name__)
+
 
 async def basic_usage_example():
     """Basic usage example showing GET, POST, and DELETE operations"""
@@ -23,33 +25,33 @@ async def basic_usage_example():
     async with AnythingLLMRepository(config) as repo:
         try:
             # GET request - fetch all workspaces
-            print("Fetching workspaces...")
+            logger.info("Fetching workspaces...")
             workspaces = await repo.get("/api/v1/workspaces")
-            print(f"Found {len(workspaces.get('workspaces', []))} workspaces")
+            logger.info("Found %d workspaces", len(workspaces.get("workspaces", [])))
 
             # POST request - create a new workspace
-            print("\nCreating new workspace...")
+            logger.info("Creating new workspace...")
             new_workspace_data = {"name": "Test Workspace", "description": "A test workspace created via API"}
             created_workspace = await repo.post("/api/v1/workspaces", json_data=new_workspace_data)
             workspace_id = created_workspace.get("id")
-            print(f"Created workspace with ID: {workspace_id}")
+            logger.info("Created workspace with ID: %s", workspace_id)
 
             # GET request with parameters
-            print(f"\nFetching workspace {workspace_id}...")
+            logger.info("Fetching workspace %s...", workspace_id)
             workspace = await repo.get(f"/api/v1/workspaces/{workspace_id}")
-            print(f"Workspace details: {workspace}")
+            logger.info("Workspace details: %s", workspace)
 
             # DELETE request - remove the workspace
-            print(f"\nDeleting workspace {workspace_id}...")
+            logger.info("Deleting workspace %s...", workspace_id)
             delete_result = await repo.delete(f"/api/v1/workspaces/{workspace_id}")
-            print(f"Delete result: {delete_result}")
+            logger.info("Delete result: %s", delete_result)
 
         except AuthenticationError as e:
-            print(f"Authentication error: {e}")
+            logger.error("Authentication error: %s", e)
         except NetworkError as e:
-            print(f"Network error: {e}")
+            logger.error("Network error: %s", e)
         except AnythingLLMRepositoryError as e:
-            print(f"Repository error: {e}")
+            logger.error("Repository error: %s", e)
 
 
 async def advanced_usage_example():
@@ -66,45 +68,45 @@ async def advanced_usage_example():
     async with AnythingLLMRepository(config) as repo:
         try:
             # Use convenience methods
-            print("Using convenience methods...")
+            logger.info("Using convenience methods...")
 
             # Get all workspaces using convenience method
             workspaces = await repo.get_workspaces()
-            print(f"Workspaces: {workspaces}")
+            logger.info("Workspaces: %s", workspaces)
 
             # Create workspace using convenience method
             workspace_data = {"name": "Advanced Test Workspace"}
             created = await repo.create_workspace(workspace_data)
             workspace_id = created.get("id")
-            print(f"Created workspace: {created}")
+            logger.info("Created workspace: %s", created)
 
             # PUT request - full update
-            print(f"\nUpdating workspace {workspace_id}...")
+            logger.info("Updating workspace %s...", workspace_id)
             update_data = {"name": "Updated Workspace Name", "description": "Updated description"}
             updated = await repo.put(f"/api/v1/workspaces/{workspace_id}", json_data=update_data)
-            print(f"Updated workspace: {updated}")
+            logger.info("Updated workspace: %s", updated)
 
             # PATCH request - partial update
-            print(f"\nPatching workspace {workspace_id}...")
+            logger.info("Patching workspace %s...", workspace_id)
             patch_data = {"description": "Patched description"}
             patched = await repo.patch(f"/api/v1/workspaces/{workspace_id}", json_data=patch_data)
-            print(f"Patched workspace: {patched}")
+            logger.info("Patched workspace: %s", patched)
 
             # Get documents in workspace
             documents = await repo.get_documents(workspace_id)
-            print(f"Documents in workspace: {documents}")
+            logger.info("Documents in workspace: %s", documents)
 
             # Upload document to workspace
             document_data = {"name": "test_document.pdf", "type": "pdf", "content": "base64_encoded_content_here"}
             uploaded = await repo.upload_document(workspace_id, document_data)
-            print(f"Uploaded document: {uploaded}")
+            logger.info("Uploaded document: %s", uploaded)
 
             # Clean up - delete workspace
             await repo.delete_workspace(workspace_id)
-            print(f"Cleaned up workspace {workspace_id}")
+            logger.info("Cleaned up workspace %s", workspace_id)
 
         except Exception as e:
-            print(f"Error in advanced example: {e}")
+            logger.error("Error in advanced example: %s", e)
 
 
 async def error_handling_example():
@@ -120,16 +122,16 @@ async def error_handling_example():
         try:
             # This will fail due to invalid URL
             result = await repo.get("/api/v1/workspaces")
-            print(f"Result: {result}")
+            logger.info("Result: %s", result)
 
         except NetworkError as e:
-            print(f"Network error caught: {e}")
+            logger.error("Network error caught: %s", e)
         except AuthenticationError as e:
-            print(f"Authentication error caught: {e}")
+            logger.error("Authentication error caught: %s", e)
         except AnythingLLMRepositoryError as e:
-            print(f"Repository error caught: {e}")
+            logger.error("Repository error caught: %s", e)
         except Exception as e:
-            print(f"Unexpected error: {e}")
+            logger.error("Unexpected error: %s", e)
 
 
 async def concurrent_requests_example():
@@ -146,37 +148,38 @@ async def concurrent_requests_example():
 
             for i, result in enumerate(results):
                 if isinstance(result, Exception):
-                    print(f"Task {i} failed: {result}")
+                    logger.error("Task %d failed: %s", i, result)
                 else:
-                    print(f"Task {i} succeeded: {result}")
+                    logger.info("Task %d succeeded: %s", i, result)
 
         except Exception as e:
-            print(f"Error in concurrent example: {e}")
+            logger.error("Error in concurrent example: %s", e)
 
 
 async def main():
     """Main function to run all examples"""
-    print("=== AnythingLLM Repository Usage Examples ===\n")
+    logger.info("=== AnythingLLM Repository Usage Examples ===")
 
-    print("1. Basic Usage Example:")
+    logger.info("1. Basic Usage Example:")
     await basic_usage_example()
-    print("\n" + "=" * 50 + "\n")
+    logger.info("=" * 50)
 
-    print("2. Advanced Usage Example:")
+    logger.info("2. Advanced Usage Example:")
     await advanced_usage_example()
-    print("\n" + "=" * 50 + "\n")
+    logger.info("=" * 50)
 
-    print("3. Error Handling Example:")
+    logger.info("3. Error Handling Example:")
     await error_handling_example()
-    print("\n" + "=" * 50 + "\n")
+    logger.info("=" * 50)
 
-    print("4. Concurrent Requests Example:")
+    logger.info("4. Concurrent Requests Example:")
     await concurrent_requests_example()
-    print("\n" + "=" * 50 + "\n")
+    logger.info("=" * 50)
 
 
 if __name__ == "__main__":
-    # Set up logging
+    # Set up logging; raise the level to WARNING when using the examples as a load generator so that formatting
+    # and writing the responses is skipped and does not dominate the measurement.
     logging.basicConfig(level=logging.INFO)
 
     # Run the examples
@@ -66,8 +66,8 @@ async def main():
             User(keycloak_id="user-101", internal_id=4, name="Alice Brown", role="admin"),
         ]
 
-        for user in users_to_create:
-            await user_repository.save(user)
+        # A single batched INSERT instead of one round trip per user
+        for user in await user_repository.save_many(users_to_create):
             print(f"Created user: {user.name}")
 
         # Example 5: List all users
@@ -79,12 +79,14 @@ async def main():
 
         # Example 6: Filter users by role
         print("\n=== Filtering users by role ===")
-        admin_users = await user_repository.get_users_by_role("admin")
+        # Both roles are fetched with one query
+        users_by_role = await user_repository.get_users_by_roles(["admin", "manager"])
+        admin_users = users_by_role["admin"]
         print(f"Admin users: {len(admin_users)}")
         for user in admin_users:
             print(f"- {user.name}")
 
-        manager_users = await user_repository.get_users_by_role("manager")
+        manager_users = users_by_role["manager"]
         print(f"Manager users: {len(manager_users)}")
         for user in manager_users:
             print(f"- {user.name}")
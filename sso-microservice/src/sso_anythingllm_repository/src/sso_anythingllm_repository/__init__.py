@@ -4,7 +4,10 @@ SSO AnythingLLM Repository
 A comprehensive async REST API client for AnythingLLM with support for GET, POST, DELETE, PUT, and PATCH methods.
 """
 
-from sso_anythingllm_repository.anything_llm_repository import AnythingLLMRepository
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+from sso_anythingllm_repository.anything_llm_repository import CLIENT_LIMITS, AnythingLLMRepository
 from sso_anythingllm_repository.config import AnythingLLMConfig, AsyncPostgresConf
 from sso_anythingllm_repository.exceptions import (
     AnythingLLMRepositoryError,
@@ -19,8 +22,31 @@ from sso_anythingllm_repository.interfaces import (
     UserRepositoryInterface,
 )
 
+
+def __getattr__(name: str) -> str:
+    """Resolve ``__version__`` on first access (PEP 562) instead of at import time.
+
+    The installed distribution metadata is used; the VERSION file is only read when the package is not installed.
+    """
+    if name == "__version__":
+        try:
+            package_version = version("sso_anythingllm_repository")
+        except PackageNotFoundError:
+            version_file = Path(__file__).parents[2] / "VERSION"
+            if not version_file.exists():
+                raise FileNotFoundError(
+                    f"VERSION file not found at {version_file}. Ensure the VERSION file exists in the package"
+                )
+            package_version = version_file.read_text().strip()
+        globals()["__version__"] = package_version
+        return package_version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
+    "__version__",
     "AnythingLLMRepository",
+    "CLIENT_LIMITS",
     "AnythingLLMConfig",
     "AsyncPostgresConf",
     "AnythingLLMRepositoryError",
@@ -32,5 +58,3 @@ __all__ = [
     "AnythingLLMRepositoryInterface",
     "ApiKeyRepositoryInterface",
 ]
-
-__version__ = "1.0.0"
@@ -1,7 +1,10 @@
 import asyncio
+import json
 import logging
-from typing import Any, Dict, Optional
-from urllib.parse import urljoin
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlencode
 
 import httpx
 from httpx import ConnectError, RequestError, TimeoutException
@@ -9,18 +12,93 @@ from httpx import ConnectError, RequestError, TimeoutException
 from sso_anythingllm_repository.config import AnythingLLMConfig
 from sso_anythingllm_repository.exceptions import AnythingLLMRepositoryError, AuthenticationError, NetworkError
 
+# Connection pool limits for the AnythingLLM clients, sized for bursts of concurrent SSO logins. Idle connections are
+# kept for a minute so consecutive requests skip the TCP/TLS handshake.
+CLIENT_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=60.0)
+# Maximum number of requests of a bulk operation that are in flight at the same time.
+BULK_CONCURRENCY = 16
+# Maximum number of cached GET responses per repository instance.
+GET_CACHE_MAX_SIZE = 1024
+# Bounds (seconds) of the decorrelated jitter backoff between retries.
+RETRY_BACKOFF_BASE_SECONDS = 1.0
+RETRY_BACKOFF_CAP_SECONDS = 16.0
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _ok(response: httpx.Response) -> Dict[str, Any]:
+    return response.json() if response.content else {}
+
+
+def _created(response: httpx.Response) -> Dict[str, Any]:
+    return response.json() if response.content else {"status": "created"}
+
+
+def _no_content(response: httpx.Response) -> Dict[str, Any]:
+    return {"status": "no_content"}
+
+
+def _unauthorized(response: httpx.Response) -> Dict[str, Any]:
+    raise AuthenticationError(f"Authentication failed: {response.text}")
+
+
+def _forbidden(response: httpx.Response) -> Dict[str, Any]:
+    raise AuthenticationError(f"Access forbidden: {response.text}")
+
+
+def _not_found(response: httpx.Response) -> Dict[str, Any]:
+    raise AnythingLLMRepositoryError(f"Resource not found: {response.text}")
+
+
+def _next_backoff(previous: float) -> float:
+    """Decorrelated jitter: spread the retries of concurrent clients instead of waking them all at once."""
+    return min(RETRY_BACKOFF_CAP_SECONDS, random.uniform(RETRY_BACKOFF_BASE_SECONDS, previous * 3))
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait advertised by the server through Retry-After, if given as a number of seconds."""
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return min(RETRY_BACKOFF_CAP_SECONDS, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+# Outcome of every status code that is neither retried nor unexpected. The body is only decoded as text on errors.
+_STATUS_HANDLERS: Dict[int, Callable[[httpx.Response], Dict[str, Any]]] = {
+    200: _ok,
+    201: _created,
+    204: _no_content,
+    401: _unauthorized,
+    403: _forbidden,
+    404: _not_found,
+}
+
 
 class AnythingLLMRepository:
     """
     REST API client for AnythingLLM with support for GET, POST, DELETE, PUT, and PATCH methods.
     This class provides a comprehensive interface for interacting with the AnythingLLM REST API
     with configurable arguments such as URL, headers, timeouts, and retry logic.
+
+    An application-wide ``httpx.AsyncClient`` can be passed as ``client`` so every repository reuses the same
+    connection pool. The shared client is not closed by the repository, and its own ``verify`` setting applies.
     """
 
-    def __init__(self, config: AnythingLLMConfig):
+    # Services create a repository per AnythingLLM call, slots keep those instances small.
+    __slots__ = ("config", "_client", "_owns_client", "_base_url", "_get_cache", "_get_inflight")
+
+    def __init__(self, config: AnythingLLMConfig, client: Optional[httpx.AsyncClient] = None):
         self.config = config
-        self.logger = logging.getLogger(__name__)
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[httpx.AsyncClient] = client
+        self._owns_client: bool = client is None
+        # Endpoints are appended to the base URL, normalised once here instead of resolved with urljoin per request.
+        self._base_url: str = config.base_url.rstrip("/") + "/"
+        # Cached idempotent GET responses and the ones being fetched, by (endpoint, auth_token).
+        self._get_cache: Dict[tuple[str, Optional[str]], tuple[float, Dict[str, Any]]] = {}
+        self._get_inflight: Dict[tuple[str, Optional[str]], asyncio.Task[Dict[str, Any]]] = {}
 
     async def __aenter__(self):
         await self._ensure_client()
@@ -36,27 +114,24 @@ class AnythingLLMRepository:
                 headers=self.config.get_headers(),
                 timeout=self.config.timeout,
                 verify=self.config.verify_ssl,
+                limits=CLIENT_LIMITS,
             )
 
     async def close(self):
-        if self._client:
+        if self._client and self._owns_client:
             await self._client.aclose()
             self._client = None
 
     def _build_url(self, endpoint: str) -> str:
-        return urljoin(self.config.base_url, endpoint.lstrip("/"))
+        return self._base_url + endpoint.lstrip("/")
 
     def _get_auth_headers(self, auth_token: Optional[str] = None) -> Dict[str, str]:
         """Get authentication headers for requests"""
-        headers = self.config.get_headers().copy()
-
-        # If auth_token is provided, use it; otherwise use config API key
+        # If auth_token is provided, use it; otherwise use config API key. The default headers are shared and
+        # already carry the API key, a new dict is only built for an explicit token.
         if auth_token:
-            headers["Authorization"] = f"Bearer {auth_token}"
-        elif self.config.api_key:
-            headers["Authorization"] = f"Bearer {self.config.api_key}"
-
-        return headers
+            return {**self.config.cached_default_headers, "Authorization": f"Bearer {auth_token}"}
+        return self.config.cached_default_headers
 
     async def _make_request(
         self,
@@ -74,39 +149,42 @@ class AnythingLLMRepository:
         # Get authentication headers
         auth_headers = self._get_auth_headers(auth_token)
 
-        request_kwargs = {"params": params, **kwargs}
-        if data is not None:
-            request_kwargs["data"] = data
-        if json_data is not None:
-            request_kwargs["json"] = json_data
-
-        # Merge auth headers with request headers
-        if "headers" in request_kwargs:
-            request_kwargs["headers"].update(auth_headers)
-        else:
-            request_kwargs["headers"] = auth_headers
-
+        # The timeout is set per request as well, a shared client is not built from this repository's config.
+        # Auth headers take precedence over caller headers, which are copied rather than updated in place.
+        extra_headers = kwargs.pop("headers", None)
+        headers = auth_headers if extra_headers is None else {**extra_headers, **auth_headers}
+        # The body is encoded once here so retries resend the same bytes. Form data wins over JSON, as in httpx.
+        body: Optional[bytes] = None
+        if data:
+            body = urlencode(data, doseq=True).encode()
+            headers = {**headers, "Content-Type": "application/x-www-form-urlencoded"}
+        elif json_data is not None:
+            body = json.dumps(json_data, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode()
+            headers = {**headers, "Content-Type": "application/json"}
+        request_kwargs = {
+            "params": params,
+            "timeout": self.config.timeout,
+            "headers": headers,
+            **({"content": body} if body is not None else {}),
+            **kwargs,
+        }
+
+        status_handlers = _STATUS_HANDLERS
+        backoff = RETRY_BACKOFF_BASE_SECONDS
         for attempt in range(self.config.max_retries + 1):
             try:
-                self.logger.debug(f"Making {method} request to {url} (attempt {attempt + 1})")
+                _LOGGER.debug("Making %s request to %s (attempt %d)", method, url, attempt + 1)
                 response = await self._client.request(method, url, **request_kwargs)
 
-                if response.status_code == 200:
-                    return response.json() if response.content else {}
-                elif response.status_code == 201:
-                    return response.json() if response.content else {"status": "created"}
-                elif response.status_code == 204:
-                    return {"status": "no_content"}
-                elif response.status_code == 401:
-                    raise AuthenticationError(f"Authentication failed: {response.text}")
-                elif response.status_code == 403:
-                    raise AuthenticationError(f"Access forbidden: {response.text}")
-                elif response.status_code == 404:
-                    raise AnythingLLMRepositoryError(f"Resource not found: {response.text}")
-                elif response.status_code >= 500:
+                handler = status_handlers.get(response.status_code)
+                if handler is not None:
+                    return handler(response)
+                if response.status_code >= 500:
                     if attempt < self.config.max_retries:
-                        wait_time = 2**attempt
-                        self.logger.warning(f"Server error {response.status_code}, retrying in {wait_time}s")
+                        backoff = _next_backoff(backoff)
+                        retry_after = _retry_after(response)
+                        wait_time = backoff if retry_after is None else retry_after
+                        _LOGGER.warning("Server error %d, retrying in %.2fs", response.status_code, wait_time)
                         await asyncio.sleep(wait_time)
                         continue
                     else:
@@ -115,8 +193,8 @@ class AnythingLLMRepository:
                     raise AnythingLLMRepositoryError(f"HTTP {response.status_code}: {response.text}")
             except TimeoutException as e:
                 if attempt < self.config.max_retries:
-                    wait_time = 2**attempt
-                    self.logger.warning(f"Timeout, retrying in {wait_time}s")
+                    backoff = wait_time = _next_backoff(backoff)
+                    _LOGGER.warning("Timeout, retrying in %.2fs", wait_time)
                     await asyncio.sleep(wait_time)
                     continue
                 else:
@@ -164,29 +242,78 @@ class AnythingLLMRepository:
     ) -> Dict[str, Any]:
         return await self._make_request("PATCH", endpoint, data=data, json_data=json_data, auth_token=auth_token)
 
+    async def _cached_get(self, endpoint: str, auth_token: Optional[str] = None) -> Dict[str, Any]:
+        """GET an idempotent endpoint through the response cache.
+
+        Responses are kept for ``config.cache_ttl`` seconds and concurrent reads of the same endpoint share one request.
+        The cached dicts are handed out as is, callers must not mutate them.
+        """
+        if self.config.cache_ttl <= 0:
+            return await self.get(endpoint, auth_token=auth_token)
+
+        key = (endpoint, auth_token)
+        cached = self._get_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        task = self._get_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.get(endpoint, auth_token=auth_token))
+            self._get_inflight[key] = task
+            task.add_done_callback(lambda done: self._store_get_response(key, done))
+        # Shielded so a cancelled caller does not cancel the request the other callers are waiting for.
+        return await asyncio.shield(task)
+
+    def _store_get_response(self, key: tuple[str, Optional[str]], task: asyncio.Task[Dict[str, Any]]) -> None:
+        if self._get_inflight.get(key) is not task:
+            # The cache was invalidated while the request was in flight, its response may be stale.
+            return
+        del self._get_inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._get_cache.pop(key, None)
+        if len(self._get_cache) >= GET_CACHE_MAX_SIZE:
+            # Dicts keep insertion order, the first entry is the oldest one.
+            del self._get_cache[next(iter(self._get_cache))]
+        self._get_cache[key] = (time.monotonic() + self.config.cache_ttl, task.result())
+
+    def invalidate_cache(self) -> None:
+        """Drop every cached GET response. Reads still in flight are not cached when they complete."""
+        self._get_cache.clear()
+        self._get_inflight.clear()
+
     async def get_workspaces(self, auth_token: Optional[str] = None) -> Dict[str, Any]:
-        return await self.get("/api/v1/workspaces", auth_token=auth_token)
+        return await self._cached_get("/api/v1/workspaces", auth_token=auth_token)
 
     async def get_workspace(self, workspace_id: str, auth_token: Optional[str] = None) -> Dict[str, Any]:
-        return await self.get(f"/api/v1/workspaces/{workspace_id}", auth_token=auth_token)
+        return await self._cached_get(f"/api/v1/workspaces/{workspace_id}", auth_token=auth_token)
 
     async def create_workspace(
         self, workspace_data: Dict[str, Any], auth_token: Optional[str] = None
     ) -> Dict[str, Any]:
-        return await self.post("/api/v1/workspaces", json_data=workspace_data, auth_token=auth_token)
+        try:
+            return await self.post("/api/v1/workspaces", json_data=workspace_data, auth_token=auth_token)
+        finally:
+            self.invalidate_cache()
 
     async def delete_workspace(self, workspace_id: str, auth_token: Optional[str] = None) -> Dict[str, Any]:
-        return await self.delete(f"/api/v1/workspaces/{workspace_id}", auth_token=auth_token)
+        try:
+            return await self.delete(f"/api/v1/workspaces/{workspace_id}", auth_token=auth_token)
+        finally:
+            self.invalidate_cache()
 
     async def get_documents(self, workspace_id: str, auth_token: Optional[str] = None) -> Dict[str, Any]:
-        return await self.get(f"/api/v1/workspaces/{workspace_id}/documents", auth_token=auth_token)
+        return await self._cached_get(f"/api/v1/workspaces/{workspace_id}/documents", auth_token=auth_token)
 
     async def upload_document(
         self, workspace_id: str, document_data: Dict[str, Any], auth_token: Optional[str] = None
     ) -> Dict[str, Any]:
-        return await self.post(
-            f"/api/v1/workspaces/{workspace_id}/documents", json_data=document_data, auth_token=auth_token
-        )
+        try:
+            return await self.post(
+                f"/api/v1/workspaces/{workspace_id}/documents", json_data=document_data, auth_token=auth_token
+            )
+        finally:
+            self.invalidate_cache()
 
     # ----------------------------  Especific methods to use in bussines logic ---------------------------------------
 
@@ -215,3 +342,44 @@ class AnythingLLMRepository:
 
     async def issue_auth_token(self, user_id: int, auth_token: Optional[str] = None) -> Dict[str, Any]:
         return await self.get(f"/api/v1/users/{user_id}/issue-auth-token", auth_token=auth_token)
+
+    # ----------------------------  Bulk variants of the admin operations ---------------------------------------------
+
+    async def _gather_bounded(
+        self, calls: Iterable[Awaitable[Dict[str, Any]]], concurrency: int
+    ) -> List[Dict[str, Any]]:
+        """Await the calls concurrently, at most ``concurrency`` at a time, returning the results in order."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(call: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+            async with semaphore:
+                return await call
+
+        return await asyncio.gather(*(bounded(call) for call in calls))
+
+    async def create_users_bulk(
+        self,
+        users_data: List[Dict[str, str]],
+        auth_token: Optional[str] = None,
+        concurrency: int = BULK_CONCURRENCY,
+    ) -> List[Dict[str, Any]]:
+        """Creates several users in AnythingLLM concurrently, returning the responses in the same order."""
+        return await self._gather_bounded(
+            (self.create_user(user_data, auth_token=auth_token) for user_data in users_data), concurrency
+        )
+
+    async def delete_users_bulk(
+        self, user_ids: List[int], auth_token: Optional[str] = None, concurrency: int = BULK_CONCURRENCY
+    ) -> List[Dict[str, Any]]:
+        """Deletes several AnythingLLM users concurrently, returning the responses in the same order."""
+        return await self._gather_bounded(
+            (self.delete_user(user_id, auth_token=auth_token) for user_id in user_ids), concurrency
+        )
+
+    async def issue_auth_tokens_bulk(
+        self, user_ids: List[int], auth_token: Optional[str] = None, concurrency: int = BULK_CONCURRENCY
+    ) -> List[Dict[str, Any]]:
+        """Issues one-time access tokens for several users concurrently, returning the responses in the same order."""
+        return await self._gather_bounded(
+            (self.issue_auth_token(user_id, auth_token=auth_token) for user_id in user_ids), concurrency
+        )
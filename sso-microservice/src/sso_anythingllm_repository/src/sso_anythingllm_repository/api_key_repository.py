@@ -2,6 +2,7 @@ import logging
 from typing import List
 
 from kink import inject
+from sqlalchemy import bindparam, exists, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from typing_extensions import override
@@ -11,6 +12,14 @@ from sso_anythingllm_repository.config import AsyncPostgresConf
 from sso_anythingllm_repository.exceptions import ValidationError
 from sso_anythingllm_repository.interfaces.api_key_repository_interface import ApiKeyRepositoryInterface
 
+# Statements built once at import and executed with bound parameters, so every call reuses the same construct and its
+# compiled form from the engine's statement cache.
+_SELECT_BY_VALUE = select(ApiKey).where(ApiKey.value == bindparam("value"))
+_EXISTS_BY_VALUE = select(exists().where(ApiKey.value == bindparam("value")))
+_SELECT_ALL = select(ApiKey)
+_SELECT_FIRST = select(ApiKey).limit(1)
+_COUNT = select(func.count()).select_from(ApiKey)
+
 
 @inject(alias=ApiKeyRepositoryInterface)
 class ApiKeyRepository(ApiKeyRepositoryInterface):
@@ -22,15 +31,20 @@ class ApiKeyRepository(ApiKeyRepositoryInterface):
 
     def _get_session(self) -> AsyncSession:
         """Get an async database session."""
-        return AsyncSession(self.db_config.engine)
+        return self.db_config.session_factory()
+
+    @staticmethod
+    async def _exists(session: AsyncSession, value: str) -> bool:
+        """Check for an API key with ``SELECT EXISTS``, without loading the row into an entity."""
+        result = await session.execute(_EXISTS_BY_VALUE, {"value": value})
+        return bool(result.scalar())
 
     @override
     async def get_by_value(self, value: str) -> ApiKey:
         """Get an API key by its value."""
         async with self._get_session() as session:
             try:
-                statement = select(ApiKey).where(ApiKey.value == value)
-                result = await session.execute(statement)
+                result = await session.execute(_SELECT_BY_VALUE, {"value": value})
                 api_key = result.scalar_one_or_none()
 
                 if not api_key:
@@ -48,12 +62,8 @@ class ApiKeyRepository(ApiKeyRepositoryInterface):
         async with self._get_session() as session:
             try:
                 # Check if API key already exists
-                if api_key.value:
-                    statement = select(ApiKey).where(ApiKey.value == api_key.value)
-                    result = await session.execute(statement)
-                    existing_api_key = result.scalar_one_or_none()
-                    if existing_api_key:
-                        raise ValidationError(f"API key with value '{api_key.value}' already exists")
+                if api_key.value and await self._exists(session, api_key.value):
+                    raise ValidationError(f"API key with value '{api_key.value}' already exists")
 
                 session.add(api_key)
                 await session.commit()
@@ -74,19 +84,14 @@ class ApiKeyRepository(ApiKeyRepositoryInterface):
         """Update an existing API key in the database."""
         async with self._get_session() as session:
             try:
-                # Check if API key exists and get the existing API key
-                statement = select(ApiKey).where(ApiKey.value == api_key.value)
-                result = await session.execute(statement)
+                # ApiKey only has its primary key, so there is nothing to SET: a single lookup replaces the former
+                # select, empty commit and refresh. Once it has more columns, this becomes an UPDATE ... RETURNING.
+                result = await session.execute(_SELECT_BY_VALUE, {"value": api_key.value})
                 db_api_key = result.scalar_one_or_none()
 
                 if not db_api_key:
                     raise ValidationError(f"API key with value '{api_key.value}' not found")
 
-                # Update fields (in this case, ApiKey only has one field, so we'll just return the existing one)
-                # If ApiKey had more fields, we would update them here
-                await session.commit()
-                await session.refresh(db_api_key)
-
                 self.logger.info(f"Successfully updated API key with value '{api_key.value}'")
                 return db_api_key
             except ValidationError:
@@ -103,8 +108,7 @@ class ApiKeyRepository(ApiKeyRepositoryInterface):
         async with self._get_session() as session:
             try:
                 # Check if API key exists and get the API key to delete
-                statement = select(ApiKey).where(ApiKey.value == value)
-                result = await session.execute(statement)
+                result = await session.execute(_SELECT_BY_VALUE, {"value": value})
                 api_key = result.scalar_one_or_none()
 
                 if not api_key:
@@ -127,30 +131,41 @@ class ApiKeyRepository(ApiKeyRepositoryInterface):
         """Get all API keys from the database."""
         async with self._get_session() as session:
             try:
-                statement = select(ApiKey)
-                result = await session.execute(statement)
+                result = await session.execute(_SELECT_ALL)
                 return list(result.scalars().all())
             except Exception as e:
                 self.logger.error(f"Error retrieving all API keys: {e}")
                 raise ValidationError(f"Failed to retrieve API keys: {str(e)}")
 
+    @override
+    async def get_first_api_key(self) -> ApiKey | None:
+        """Get a single API key from the database, or None if there is none."""
+        async with self._get_session() as session:
+            try:
+                result = await session.execute(_SELECT_FIRST)
+                return result.scalars().first()
+            except Exception as e:
+                self.logger.error(f"Error retrieving first API key: {e}")
+                raise ValidationError(f"Failed to retrieve API key: {str(e)}")
+
     @override
     async def api_key_exists(self, value: str) -> bool:
         """Check if an API key exists by its value."""
-        try:
-            await self.get_by_value(value)
-            return True
-        except ValidationError:
-            return False
+        async with self._get_session() as session:
+            try:
+                return await self._exists(session, value)
+            except Exception as e:
+                self.logger.error(f"Error checking API key with value '{value}': {e}")
+                raise ValidationError(f"Failed to check API key: {str(e)}")
 
     @override
     async def count_api_keys(self) -> int:
         """Get the total number of API keys in the database."""
         async with self._get_session() as session:
             try:
-                statement = select(ApiKey)
-                result = await session.execute(statement)
-                return len(result.scalars().all())
+                # COUNT(*) in the database instead of loading every row to take its length.
+                result = await session.execute(_COUNT)
+                return int(result.scalar_one())
             except Exception as e:
                 self.logger.error(f"Error counting API keys: {e}")
                 raise ValidationError(f"Failed to count API keys: {str(e)}")
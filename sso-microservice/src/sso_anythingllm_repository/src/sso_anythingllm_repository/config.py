@@ -1,22 +1,70 @@
+import asyncio
+from functools import cached_property
+
 from pydantic import BaseModel
-from sqlalchemy import URL, Engine, create_engine
+from sqlalchemy import URL, Engine, create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.ext.asyncio.engine import AsyncEngine, create_async_engine
 
 
 class AsyncPostgresConf(BaseModel):
+    """PostgreSQL connection settings and the pooled engine shared by the repositories.
+
+    To pool connections across replicas, point ``host``/``port`` at PgBouncer (e.g. ``pgbouncer:6432`` with
+    ``pool_mode = transaction``). PgBouncer < 1.21 does not support prepared statements in transaction mode, set
+    ``prepared_statement_cache_size`` to 0 there; newer versions need ``max_prepared_statements`` enabled instead.
+    """
+
     username: str
     password: str
     host: str
     port: int
     database: str
+    # Prepared statements asyncpg keeps per connection, the SQLAlchemy dialect default is 100.
+    prepared_statement_cache_size: int = 1024
+    # Connections opened by warm_up before the first requests.
+    warm_up_connections: int = 5
+    # Connection pool of the async engine. The SQLAlchemy defaults (5 connections, no pre-ping, no recycling) serialise
+    # concurrent logins and hand out connections PostgreSQL has already closed for being idle.
+    pool_size: int = 20
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
 
-    @property
+    @cached_property
     def engine(self) -> AsyncEngine:
-        """SQLAlchemy engine"""
-        return create_async_engine(url=self.url)
+        """SQLAlchemy engine, created once so every session checks out connections from the same pool."""
+        return create_async_engine(
+            url=self.url,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+            connect_args={"prepared_statement_cache_size": self.prepared_statement_cache_size},
+        )
 
-    @property
+    @cached_property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Session factory bound to ``engine``, shared by the repositories.
+
+        Objects are not expired on commit, so returning a saved entity does not trigger a reload query on access.
+        """
+        return async_sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def warm_up(self) -> None:
+        """Open ``warm_up_connections`` pooled connections in parallel, so the first requests skip the handshake."""
+
+        async def ping() -> None:
+            async with self.engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+
+        await asyncio.gather(*(ping() for _ in range(self.warm_up_connections)))
+
+    @cached_property
     def sync_engine(self) -> Engine:
+        """Synchronous engine for migrations and health checks, created once like ``engine``."""
         # Create a sync URL by replacing the async driver with sync driver
         sync_url = URL.create(
             drivername="postgresql+psycopg2",  # Use psycopg2 for sync operations
@@ -49,6 +97,8 @@ class AnythingLLMConfig(BaseModel):
     max_retries: int = 3
     headers: dict[str, str] | None = None
     verify_ssl: bool = True
+    # Seconds the workspace and document reads are cached by a repository instance, 0 disables the cache.
+    cache_ttl: float = 30.0
 
     def get_headers(self) -> dict[str, str]:
         """Get headers for API requests"""
@@ -57,3 +107,8 @@ class AnythingLLMConfig(BaseModel):
             headers["Authorization"] = f"Bearer {self.api_key}"
         headers.setdefault("Content-Type", "application/json")
         return headers
+
+    @cached_property
+    def cached_default_headers(self) -> dict[str, str]:
+        """Headers for requests authenticated with the configured API key, built once. Must not be mutated."""
+        return self.get_headers().copy()
@@ -21,6 +21,8 @@ class ApiKeyRepositoryInterface(Protocol):
     # ──────────────────────────── ADDITIONAL CRUD OPERATIONS ────────────────────────────
     async def get_all_api_keys(self) -> list[ApiKey]: ...
 
+    async def get_first_api_key(self) -> ApiKey | None: ...
+
     async def api_key_exists(self, value: str) -> bool: ...
 
     async def count_api_keys(self) -> int: ...
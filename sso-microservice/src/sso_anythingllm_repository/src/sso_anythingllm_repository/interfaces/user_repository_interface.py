@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from typing import Protocol
 
 from sso_anythingllm_entity.user import User
@@ -11,9 +12,16 @@ class UserRepositoryInterface(Protocol):
 
     async def get_by_anythingllm_id(self, anythingllm_id: int) -> User: ...
 
+    async def get_by_keycloak_ids(self, keycloak_ids: list[str]) -> list[User]: ...
+
     # ──────────────────────────── CREATE ────────────────────────────
     async def save(self, user: User) -> User: ...
 
+    async def save_many(self, users: list[User]) -> list[User]: ...
+
+    # ──────────────────────────── UPSERT ────────────────────────────
+    async def upsert(self, user: User) -> User: ...
+
     # ──────────────────────────── UPDATE ────────────────────────────
     async def update(self, user: User) -> User: ...
 
@@ -23,8 +31,12 @@ class UserRepositoryInterface(Protocol):
     # ──────────────────────────── ADDITIONAL CRUD OPERATIONS ────────────────────────────
     async def get_all_users(self) -> list[User]: ...
 
+    def get_all_users_iter(self) -> AsyncIterator[User]: ...
+
     async def get_users_by_role(self, role: str) -> list[User]: ...
 
+    async def get_users_by_roles(self, roles: list[str]) -> dict[str, list[User]]: ...
+
     async def user_exists(self, keycloak_id: str) -> bool: ...
 
     async def count_users(self) -> int: ...
@@ -15,6 +15,11 @@ def setup_di():
         database=os.environ.get("POSTGRES_DB", "sso_anythingllm"),
         host=os.environ.get("POSTGRES_HOST", "localhost"),
         port=int(os.environ.get("POSTGRES_PORT", 5432)),
+        pool_size=int(os.environ.get("POSTGRES_POOL_SIZE", 20)),
+        max_overflow=int(os.environ.get("POSTGRES_MAX_OVERFLOW", 10)),
+        pool_timeout=float(os.environ.get("POSTGRES_POOL_TIMEOUT", 30)),
+        pool_recycle=int(os.environ.get("POSTGRES_POOL_RECYCLE", 1800)),
+        pool_pre_ping=os.environ.get("POSTGRES_POOL_PRE_PING", "true").lower() == "true",
     )
     di[AsyncPostgresConf] = db_configuration
     di["async_engine"] = db_configuration.engine
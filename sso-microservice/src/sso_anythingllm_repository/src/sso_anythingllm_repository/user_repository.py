@@ -1,8 +1,15 @@
+import asyncio
 import logging
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from functools import partial
 
 from kink import inject
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
+from sqlmodel import col, select
 from typing_extensions import override
 
 from sso_anythingllm_entity.user import User
@@ -10,6 +17,12 @@ from sso_anythingllm_repository.config import AsyncPostgresConf
 from sso_anythingllm_repository.exceptions import ValidationError
 from sso_anythingllm_repository.interfaces.user_repository_interface import UserRepositoryInterface
 
+# Seconds a user read by Keycloak ID is served from the repository cache, and the maximum number of cached users.
+USER_CACHE_TTL_SECONDS = 60.0
+USER_CACHE_MAX_SIZE = 10_000
+# Rows fetched per round trip when streaming users.
+USER_STREAM_BATCH_SIZE = 500
+
 
 @inject(alias=UserRepositoryInterface)
 class UserRepository(UserRepositoryInterface):
@@ -18,14 +31,50 @@ class UserRepository(UserRepositoryInterface):
     def __init__(self, db_config: AsyncPostgresConf):
         self.db_config = db_config
         self.logger = logging.getLogger(__name__)
+        # Users read by Keycloak ID with their expiry time, and the reads in flight, by Keycloak ID.
+        self._user_cache: dict[str, tuple[float, User]] = {}
+        self._inflight: dict[str, asyncio.Task[User]] = {}
 
     def _get_session(self) -> AsyncSession:
         """Get an async database session."""
-        return AsyncSession(self.db_config.engine)
+        return self.db_config.session_factory()
+
+    def _cache_user(self, keycloak_id: str, task: asyncio.Task[User]) -> None:
+        if self._inflight.get(keycloak_id) is not task:
+            # The user was written while it was being read, the result may be stale.
+            return
+        del self._inflight[keycloak_id]
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._user_cache.pop(keycloak_id, None)
+        if len(self._user_cache) >= USER_CACHE_MAX_SIZE:
+            # Dicts keep insertion order, the first entry is the oldest one.
+            del self._user_cache[next(iter(self._user_cache))]
+        self._user_cache[keycloak_id] = (time.monotonic() + USER_CACHE_TTL_SECONDS, task.result())
+
+    def _invalidate_user(self, keycloak_id: str) -> None:
+        self._user_cache.pop(keycloak_id, None)
+        self._inflight.pop(keycloak_id, None)
 
     @override
     async def get_by_keycloak_id(self, keycloak_id: str) -> User:
-        """Get a user by their Keycloak ID."""
+        """Get a user by their Keycloak ID.
+
+        Users are cached for USER_CACHE_TTL_SECONDS and concurrent reads of the same user share one query.
+        """
+        cached = self._user_cache.get(keycloak_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        task = self._inflight.get(keycloak_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_by_keycloak_id(keycloak_id))
+            self._inflight[keycloak_id] = task
+            task.add_done_callback(partial(self._cache_user, keycloak_id))
+        # Shielded so a cancelled caller does not cancel the query the other callers are waiting for.
+        return await asyncio.shield(task)
+
+    async def _fetch_by_keycloak_id(self, keycloak_id: str) -> User:
         async with self._get_session() as session:
             try:
                 statement = select(User).where(User.keycloak_id == keycloak_id)
@@ -57,6 +106,20 @@ class UserRepository(UserRepositoryInterface):
                 self.logger.error(f"Error retrieving user by internal_id '{anythingllm_id}': {e}")
                 raise ValidationError(f"Failed to retrieve user: {str(e)}")
 
+    @override
+    async def get_by_keycloak_ids(self, keycloak_ids: list[str]) -> list[User]:
+        """Get the users matching any of the given Keycloak IDs, in a single query. Unknown IDs are skipped."""
+        if not keycloak_ids:
+            return []
+        async with self._get_session() as session:
+            try:
+                statement = select(User).where(col(User.keycloak_id).in_(keycloak_ids))
+                result = await session.execute(statement)
+                return list(result.scalars().all())
+            except Exception as e:
+                self.logger.error(f"Error retrieving users by keycloak_ids: {e}")
+                raise ValidationError(f"Failed to retrieve users: {str(e)}")
+
     # ──────────────────────────── CREATE ────────────────────────────
     @override
     async def save(self, user: User) -> User:
@@ -75,6 +138,7 @@ class UserRepository(UserRepositoryInterface):
                 await session.commit()
                 await session.refresh(user)
 
+                self._invalidate_user(user.keycloak_id)
                 self.logger.info(f"Successfully created user with keycloak_id '{user.keycloak_id}'")
                 return user
             except ValidationError:
@@ -84,28 +148,87 @@ class UserRepository(UserRepositoryInterface):
                 self.logger.error(f"Error creating user: {e}")
                 raise ValidationError(f"Failed to create user: {str(e)}")
 
+    @override
+    async def save_many(self, users: list[User]) -> list[User]:
+        """Save several new users to the database in a single batched INSERT."""
+        if not users:
+            return []
+        async with self._get_session() as session:
+            try:
+                rows = [
+                    {"keycloak_id": u.keycloak_id, "internal_id": u.internal_id, "name": u.name, "role": u.role}
+                    for u in users
+                ]
+                # One statement for all rows, the asyncpg dialect sends it as a batched executemany.
+                await session.execute(insert(User), rows)
+                await session.commit()
+
+                for u in users:
+                    self._invalidate_user(u.keycloak_id)
+                self.logger.info(f"Successfully created {len(users)} users")
+                return users
+            except Exception as e:
+                await session.rollback()
+                self.logger.error(f"Error creating users: {e}")
+                raise ValidationError(f"Failed to create users: {str(e)}")
+
+    # ──────────────────────────── UPSERT ────────────────────────────
+    @override
+    async def upsert(self, user: User) -> User:
+        """Insert the user, or overwrite the stored user with the same Keycloak ID, in a single statement."""
+        async with self._get_session() as session:
+            try:
+                values = {
+                    "keycloak_id": user.keycloak_id,
+                    "internal_id": user.internal_id,
+                    "name": user.name,
+                    "role": user.role,
+                }
+                statement = (
+                    insert(User)
+                    .values(**values)
+                    .on_conflict_do_update(
+                        index_elements=[col(User.keycloak_id)],
+                        set_={key: value for key, value in values.items() if key != "keycloak_id"},
+                    )
+                    .returning(col(User.keycloak_id), col(User.internal_id), col(User.name), col(User.role))
+                )
+                result = await session.execute(statement)
+                # Build the entity from the RETURNING row, so no refresh query is needed after the commit.
+                upserted_user = User(**result.one()._asdict())
+                await session.commit()
+
+                self._invalidate_user(user.keycloak_id)
+                self.logger.info(f"Successfully upserted user with keycloak_id '{user.keycloak_id}'")
+                return upserted_user
+            except Exception as e:
+                await session.rollback()
+                self.logger.error(f"Error upserting user: {e}")
+                raise ValidationError(f"Failed to upsert user: {str(e)}")
+
     # ──────────────────────────── UPDATE ────────────────────────────
     @override
     async def update(self, user: User) -> User:
         """Update an existing user in the database."""
         async with self._get_session() as session:
             try:
-                # Check if user exists and get the existing user
-                statement = select(User).where(User.keycloak_id == user.keycloak_id)
+                # A single UPDATE ... RETURNING, instead of selecting the user, committing and refreshing it.
+                statement = (
+                    update(User)
+                    .where(col(User.keycloak_id) == user.keycloak_id)
+                    .values(name=user.name, role=user.role, internal_id=user.internal_id)
+                    .returning(col(User.keycloak_id), col(User.internal_id), col(User.name), col(User.role))
+                )
                 result = await session.execute(statement)
-                db_user = result.scalar_one_or_none()
+                row = result.one_or_none()
 
-                if not db_user:
+                if row is None:
                     raise ValidationError(f"User with keycloak_id '{user.keycloak_id}' not found")
 
-                # Update fields
-                db_user.name = user.name
-                db_user.role = user.role
-                db_user.internal_id = user.internal_id
-
+                db_user = User(**row._asdict())
                 await session.commit()
-                await session.refresh(db_user)
 
+                self._invalidate_user(user.keycloak_id)
                 self.logger.info(f"Successfully updated user with keycloak_id '{user.keycloak_id}'")
                 return db_user
             except ValidationError:
@@ -132,6 +255,7 @@ class UserRepository(UserRepositoryInterface):
                 await session.delete(user)
                 await session.commit()
 
+                self._invalidate_user(keycloak_id)
                 self.logger.info(f"Successfully deleted user with keycloak_id '{keycloak_id}'")
             except ValidationError:
                 raise
@@ -152,6 +276,21 @@ class UserRepository(UserRepositoryInterface):
                 self.logger.error(f"Error retrieving all users: {e}")
                 raise ValidationError(f"Failed to retrieve users: {str(e)}")
 
+    async def get_all_users_iter(self) -> AsyncIterator[User]:
+        """Yield every user from a server-side cursor, USER_STREAM_BATCH_SIZE rows at a time.
+
+        Unlike get_all_users the whole table is never held in memory at once.
+        """
+        async with self._get_session() as session:
+            try:
+                statement = select(User).execution_options(yield_per=USER_STREAM_BATCH_SIZE)
+                result = await session.stream_scalars(statement)
+                async for user in result:
+                    yield user
+            except Exception as e:
+                self.logger.error(f"Error streaming all users: {e}")
+                raise ValidationError(f"Failed to retrieve users: {str(e)}")
+
     async def get_users_by_role(self, role: str) -> list[User]:
         """Get all users with a specific role."""
         async with self._get_session() as session:
@@ -163,6 +302,22 @@ class UserRepository(UserRepositoryInterface):
                 self.logger.error(f"Error retrieving users by role '{role}': {e}")
                 raise ValidationError(f"Failed to retrieve users by role: {str(e)}")
 
+    async def get_users_by_roles(self, roles: list[str]) -> dict[str, list[User]]:
+        """Get the users having any of the given roles in a single query, grouped by role."""
+        users_by_role: defaultdict[str, list[User]] = defaultdict(list)
+        if not roles:
+            return users_by_role
+        async with self._get_session() as session:
+            try:
+                statement = select(User).where(col(User.role).in_(roles))
+                result = await session.execute(statement)
+                for user in result.scalars().all():
+                    users_by_role[user.role].append(user)
+                return users_by_role
+            except Exception as e:
+                self.logger.error(f"Error retrieving users by roles {roles}: {e}")
+                raise ValidationError(f"Failed to retrieve users by roles: {str(e)}")
+
     async def user_exists(self, keycloak_id: str) -> bool:
         """Check if a user exists by their Keycloak ID."""
         try:
@@ -175,9 +330,10 @@ class UserRepository(UserRepositoryInterface):
         """Get the total number of users in the database."""
         async with self._get_session() as session:
             try:
-                statement = select(User)
+                # COUNT(*) in the database instead of loading every row to take its length.
+                statement = select(func.count()).select_from(User)
                 result = await session.execute(statement)
-                return len(result.scalars().all())
+                return int(result.scalar_one())
             except Exception as e:
                 self.logger.error(f"Error counting users: {e}")
                 raise ValidationError(f"Failed to count users: {str(e)}")
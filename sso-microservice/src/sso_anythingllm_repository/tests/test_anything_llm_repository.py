@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import MagicMock, patch
 
 import httpx
@@ -46,6 +47,13 @@ class TestAnythingLLMRepository:
         url = repository._build_url("api/v1/workspaces")
         assert url == "https://api.anythingllm.com/api/v1/workspaces"
 
+    @pytest.mark.asyncio
+    async def test_build_url_keeps_base_path(self, config):
+        """Test URL building when AnythingLLM is served under a path prefix"""
+        config.base_url = "https://internal.company.com/anythingllm/"
+        repo = AnythingLLMRepository(config)
+        assert repo._build_url("/api/v1/workspaces") == "https://internal.company.com/anythingllm/api/v1/workspaces"
+
     @pytest.mark.asyncio
     async def test_get_auth_headers_with_api_key(self, repository):
         """Test auth headers with API key from config"""
@@ -59,6 +67,8 @@ class TestAnythingLLMRepository:
         headers = repository._get_auth_headers("jwt-token-123")
         assert headers["Authorization"] == "Bearer jwt-token-123"
         assert headers["Content-Type"] == "application/json"
+        # The shared default headers are left untouched
+        assert repository.config.cached_default_headers["Authorization"] == "Bearer test-api-key"
 
     @pytest.mark.asyncio
     async def test_get_auth_headers_no_auth(self, config):
@@ -183,6 +193,50 @@ class TestAnythingLLMRepository:
                 result = await repository.get("/api/v1/workspaces")
                 assert result == {"workspaces": []}
 
+    @pytest.mark.asyncio
+    async def test_server_error_honors_retry_after(self, repository):
+        """Test the server advertised Retry-After replaces the backoff"""
+        mock_response_503 = MagicMock()
+        mock_response_503.status_code = 503
+        mock_response_503.headers = httpx.Headers({"Retry-After": "0"})
+
+        mock_response_200 = MagicMock()
+        mock_response_200.status_code = 200
+        mock_response_200.json.return_value = {"workspaces": []}
+        mock_response_200.content = b'{"workspaces": []}'
+
+        await repository._ensure_client()
+        with patch.object(repository._client, "request", side_effect=[mock_response_503, mock_response_200]):
+            with patch("asyncio.sleep", return_value=None) as mock_sleep:
+                result = await repository.get("/api/v1/workspaces")
+                assert result == {"workspaces": []}
+                mock_sleep.assert_called_once_with(0.0)
+
+    @pytest.mark.asyncio
+    async def test_retry_resends_encoded_json_body(self, repository):
+        """Test the JSON body is encoded once and the same bytes are sent on every attempt"""
+        mock_response_500 = MagicMock()
+        mock_response_500.status_code = 500
+        mock_response_500.headers = httpx.Headers()
+
+        mock_response_201 = MagicMock()
+        mock_response_201.status_code = 201
+        mock_response_201.json.return_value = {"id": "123"}
+        mock_response_201.content = b'{"id": "123"}'
+
+        await repository._ensure_client()
+        with patch.object(
+            repository._client, "request", side_effect=[mock_response_500, mock_response_201]
+        ) as mock_request:
+            with patch("asyncio.sleep", return_value=None):
+                result = await repository.post("/api/v1/workspaces", json_data={"name": "Test Workspace"})
+        assert result == {"id": "123"}
+        first, second = (call.kwargs for call in mock_request.call_args_list)
+        assert first["content"] == b'{"name":"Test Workspace"}'
+        assert second["content"] is first["content"]
+        assert first["headers"]["Content-Type"] == "application/json"
+        assert "json" not in first
+
     @pytest.mark.asyncio
     async def test_timeout_error_with_retry(self, repository):
         """Test timeout error with retry logic"""
@@ -234,6 +288,43 @@ class TestAnythingLLMRepository:
             result = await repository.upload_document("123", {"name": "test.pdf"})
             assert result == {"workspaces": []}
 
+    @pytest.mark.asyncio
+    async def test_cached_get_requests(self, repository):
+        """Test idempotent GETs are cached, coalesced and invalidated by writes"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"workspaces": []}
+        mock_response.content = b'{"workspaces": []}'
+
+        await repository._ensure_client()
+        with patch.object(repository._client, "request", return_value=mock_response) as mock_request:
+            # Concurrent reads share one request, later reads are served from the cache
+            results = await asyncio.gather(repository.get_workspaces(), repository.get_workspaces())
+            assert results == [{"workspaces": []}, {"workspaces": []}]
+            await repository.get_workspaces()
+            assert mock_request.call_count == 1
+
+            # A write drops the cached responses
+            await repository.create_workspace({"name": "Test Workspace"})
+            await repository.get_workspaces()
+            assert mock_request.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_cached_get_requests_disabled(self, config):
+        """Test a cache_ttl of 0 sends every GET"""
+        config.cache_ttl = 0
+        repo = AnythingLLMRepository(config)
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"workspaces": []}
+        mock_response.content = b'{"workspaces": []}'
+
+        await repo._ensure_client()
+        with patch.object(repo._client, "request", return_value=mock_response) as mock_request:
+            await repo.get_workspaces()
+            await repo.get_workspaces()
+            assert mock_request.call_count == 2
+
     @pytest.mark.asyncio
     async def test_business_logic_methods(self, repository):
         """Test business logic methods"""
@@ -268,6 +359,40 @@ class TestAnythingLLMRepository:
             result = await repository.issue_auth_token(1)
             assert result == {"success": True}
 
+    @pytest.mark.asyncio
+    async def test_bulk_admin_methods(self, repository):
+        """Test bulk admin methods keep the input order and cap the requests in flight"""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_request(method, url, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {"url": url}
+            mock_response.content = b"{}"
+            return mock_response
+
+        await repository._ensure_client()
+        with patch.object(repository._client, "request", side_effect=fake_request):
+            results = await repository.create_users_bulk([{"username": f"user-{i}"} for i in range(5)], concurrency=2)
+            assert len(results) == 5
+            assert max_in_flight == 2
+
+            results = await repository.delete_users_bulk([1, 2, 3])
+            assert [r["url"] for r in results] == [
+                f"https://api.anythingllm.com/api/v1/admin/users/{user_id}" for user_id in (1, 2, 3)
+            ]
+
+            results = await repository.issue_auth_tokens_bulk([4, 5])
+            assert [r["url"] for r in results] == [
+                f"https://api.anythingllm.com/api/v1/users/{user_id}/issue-auth-token" for user_id in (4, 5)
+            ]
+
     @pytest.mark.asyncio
     async def test_close_client(self, repository):
         """Test client closing"""
@@ -276,6 +401,24 @@ class TestAnythingLLMRepository:
         await repository.close()
         assert repository._client is None
 
+    @pytest.mark.asyncio
+    async def test_shared_client(self, config):
+        """Test that a shared client is used for requests and left open on close"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"workspaces": []}
+        mock_response.content = b'{"workspaces": []}'
+
+        async with httpx.AsyncClient() as shared_client:
+            repo = AnythingLLMRepository(config, client=shared_client)
+            with patch.object(shared_client, "request", return_value=mock_response) as mock_request:
+                result = await repo.get("/api/v1/workspaces")
+                assert result == {"workspaces": []}
+                assert mock_request.call_args[1]["timeout"] == config.timeout
+            await repo.close()
+            assert repo._client is shared_client
+            assert not shared_client.is_closed
+
     @pytest.mark.asyncio
     async def test_put_request(self, repository):
         """Test PUT request"""
@@ -341,3 +484,12 @@ class TestAnythingLLMConfig:
         assert headers["Authorization"] == "Bearer test-key"
         assert headers["Content-Type"] == "application/json"
         assert headers["X-Custom-Header"] == "custom-value"
+
+    def test_cached_default_headers(self):
+        """Test the default headers are built once and reused"""
+        config = AnythingLLMConfig(base_url="http://localhost:3001", api_key="test-key")
+
+        headers = config.cached_default_headers
+        assert headers["Authorization"] == "Bearer test-key"
+        assert headers["Content-Type"] == "application/json"
+        assert config.cached_default_headers is headers
@@ -1,4 +1,4 @@
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
@@ -16,6 +16,7 @@ class TestApiKeyRepository:
         """Mock database configuration."""
         config = MagicMock(spec=AsyncPostgresConf)
         config.engine = MagicMock()
+        config.session_factory = MagicMock()
         return config
 
     @pytest.fixture
@@ -29,20 +30,19 @@ class TestApiKeyRepository:
         return ApiKey(value="test-api-key-123")
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_save_api_key_success(self, mock_async_session, api_key_repository, sample_api_key, mock_db_config):
+    async def test_save_api_key_success(self, api_key_repository, sample_api_key, mock_db_config):
         """Test successful API key creation."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock session.add as a regular method (not async)
         mock_session.add = MagicMock()
 
         # Mock that API key doesn't exist (for the existence check)
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
+        mock_result.scalar.return_value = False
         mock_session.execute.return_value = mock_result
 
         # Execute
@@ -55,19 +55,16 @@ class TestApiKeyRepository:
         mock_session.refresh.assert_called_once_with(sample_api_key)
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_save_api_key_already_exists(
-        self, mock_async_session, api_key_repository, sample_api_key, mock_db_config
-    ):
+    async def test_save_api_key_already_exists(self, api_key_repository, sample_api_key, mock_db_config):
         """Test API key creation when API key already exists."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock that API key exists
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = sample_api_key
+        mock_result.scalar.return_value = True
         mock_session.execute.return_value = mock_result
 
         # Execute and assert
@@ -75,13 +72,12 @@ class TestApiKeyRepository:
             await api_key_repository.save(sample_api_key)
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_get_by_value_success(self, mock_async_session, api_key_repository, sample_api_key, mock_db_config):
+    async def test_get_by_value_success(self, api_key_repository, sample_api_key, mock_db_config):
         """Test successful API key retrieval by value."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock API key found
         mock_result = MagicMock()
@@ -95,13 +91,12 @@ class TestApiKeyRepository:
         assert result == sample_api_key
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_get_by_value_not_found(self, mock_async_session, api_key_repository, mock_db_config):
+    async def test_get_by_value_not_found(self, api_key_repository, mock_db_config):
         """Test API key retrieval when API key doesn't exist."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock API key not found
         mock_result = MagicMock()
@@ -113,13 +108,12 @@ class TestApiKeyRepository:
             await api_key_repository.get_by_value("non-existent-api-key")
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_update_api_key_success(self, mock_async_session, api_key_repository, sample_api_key, mock_db_config):
+    async def test_update_api_key_success(self, api_key_repository, sample_api_key, mock_db_config):
         """Test successful API key update."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock existing API key for the existence check
         existing_api_key = ApiKey(value="test-api-key-123")
@@ -132,17 +126,17 @@ class TestApiKeyRepository:
 
         # Assertions
         assert result == existing_api_key
-        mock_session.commit.assert_called_once()
-        mock_session.refresh.assert_called_once()
+        mock_session.execute.assert_called_once()
+        mock_session.commit.assert_not_called()
+        mock_session.refresh.assert_not_called()
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_delete_api_key_success(self, mock_async_session, api_key_repository, sample_api_key, mock_db_config):
+    async def test_delete_api_key_success(self, api_key_repository, sample_api_key, mock_db_config):
         """Test successful API key deletion."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock existing API key
         mock_result = MagicMock()
@@ -157,13 +151,12 @@ class TestApiKeyRepository:
         mock_session.commit.assert_called_once()
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_get_all_api_keys(self, mock_async_session, api_key_repository, sample_api_key, mock_db_config):
+    async def test_get_all_api_keys(self, api_key_repository, sample_api_key, mock_db_config):
         """Test retrieving all API keys."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock API keys
         api_keys = [sample_api_key]
@@ -180,17 +173,58 @@ class TestApiKeyRepository:
         assert result == api_keys
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_api_key_exists_true(self, mock_async_session, api_key_repository, sample_api_key, mock_db_config):
+    async def test_get_first_api_key(self, api_key_repository, sample_api_key, mock_db_config):
+        """Test retrieving a single API key."""
+        # Mock session
+        mock_session = AsyncMock()
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+
+        # Mock API key found
+        mock_result = MagicMock()
+        mock_scalars = MagicMock()
+        mock_scalars.first.return_value = sample_api_key
+        mock_result.scalars.return_value = mock_scalars
+        mock_session.execute.return_value = mock_result
+
+        # Execute
+        result = await api_key_repository.get_first_api_key()
+
+        # Assertions
+        assert result == sample_api_key
+
+    @pytest.mark.asyncio
+    async def test_get_first_api_key_empty(self, api_key_repository, mock_db_config):
+        """Test get_first_api_key when there are no API keys."""
+        # Mock session
+        mock_session = AsyncMock()
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+
+        # Mock no API keys
+        mock_result = MagicMock()
+        mock_scalars = MagicMock()
+        mock_scalars.first.return_value = None
+        mock_result.scalars.return_value = mock_scalars
+        mock_session.execute.return_value = mock_result
+
+        # Execute
+        result = await api_key_repository.get_first_api_key()
+
+        # Assertions
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_api_key_exists_true(self, api_key_repository, sample_api_key, mock_db_config):
         """Test api_key_exists when API key exists."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock API key found
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = sample_api_key
+        mock_result.scalar.return_value = True
         mock_session.execute.return_value = mock_result
 
         # Execute
@@ -200,17 +234,16 @@ class TestApiKeyRepository:
         assert result is True
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_api_key_exists_false(self, mock_async_session, api_key_repository, mock_db_config):
+    async def test_api_key_exists_false(self, api_key_repository, mock_db_config):
         """Test api_key_exists when API key doesn't exist."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock API key not found
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
+        mock_result.scalar.return_value = False
         mock_session.execute.return_value = mock_result
 
         # Execute
@@ -220,20 +253,16 @@ class TestApiKeyRepository:
         assert result is False
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_count_api_keys(self, mock_async_session, api_key_repository, sample_api_key, mock_db_config):
+    async def test_count_api_keys(self, api_key_repository, sample_api_key, mock_db_config):
         """Test counting API keys."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
-        # Mock API keys
-        api_keys = [sample_api_key]
+        # Mock the COUNT(*) result
         mock_result = MagicMock()
-        mock_scalars = MagicMock()
-        mock_scalars.all.return_value = api_keys
-        mock_result.scalars.return_value = mock_scalars
+        mock_result.scalar_one.return_value = 1
         mock_session.execute.return_value = mock_result
 
         # Execute
@@ -243,20 +272,19 @@ class TestApiKeyRepository:
         assert result == 1
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_legacy_create_method(self, mock_async_session, api_key_repository, sample_api_key, mock_db_config):
+    async def test_legacy_create_method(self, api_key_repository, sample_api_key, mock_db_config):
         """Test legacy create method."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock session.add as a regular method (not async)
         mock_session.add = MagicMock()
 
         # Mock that API key doesn't exist
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
+        mock_result.scalar.return_value = False
         mock_session.execute.return_value = mock_result
 
         # Execute
@@ -267,13 +295,12 @@ class TestApiKeyRepository:
         mock_session.add.assert_called_once_with(sample_api_key)
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_legacy_delete_method(self, mock_async_session, api_key_repository, sample_api_key, mock_db_config):
+    async def test_legacy_delete_method(self, api_key_repository, sample_api_key, mock_db_config):
         """Test legacy delete method."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock existing API key
         mock_result = MagicMock()
@@ -287,15 +314,12 @@ class TestApiKeyRepository:
         mock_session.delete.assert_called_once_with(sample_api_key)
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.api_key_repository.AsyncSession")
-    async def test_legacy_get_api_keys_method(
-        self, mock_async_session, api_key_repository, sample_api_key, mock_db_config
-    ):
+    async def test_legacy_get_api_keys_method(self, api_key_repository, sample_api_key, mock_db_config):
         """Test legacy get_api_keys method."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock API keys
         api_keys = [sample_api_key]
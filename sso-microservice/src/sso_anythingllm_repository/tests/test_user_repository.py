@@ -1,4 +1,5 @@
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
@@ -16,6 +17,7 @@ class TestUserRepository:
         """Mock database configuration."""
         config = MagicMock(spec=AsyncPostgresConf)
         config.engine = MagicMock()
+        config.session_factory = MagicMock()
         return config
 
     @pytest.fixture
@@ -29,13 +31,12 @@ class TestUserRepository:
         return User(keycloak_id="test-keycloak-id", internal_id=123, name="Test User", role="admin")
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.user_repository.AsyncSession")
-    async def test_save_user_success(self, mock_async_session, user_repository, sample_user, mock_db_config):
+    async def test_save_user_success(self, user_repository, sample_user, mock_db_config):
         """Test successful user creation."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock session.add as a regular method (not async)
         mock_session.add = MagicMock()
@@ -55,13 +56,12 @@ class TestUserRepository:
         mock_session.refresh.assert_called_once_with(sample_user)
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.user_repository.AsyncSession")
-    async def test_save_user_already_exists(self, mock_async_session, user_repository, sample_user, mock_db_config):
+    async def test_save_user_already_exists(self, user_repository, sample_user, mock_db_config):
         """Test user creation when user already exists."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock that user exists
         mock_result = MagicMock()
@@ -73,13 +73,67 @@ class TestUserRepository:
             await user_repository.save(sample_user)
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.user_repository.AsyncSession")
-    async def test_get_by_keycloak_id_success(self, mock_async_session, user_repository, sample_user, mock_db_config):
+    async def test_save_many_users(self, user_repository, sample_user, mock_db_config):
+        """Test that several users are created with a single statement."""
+        # Mock session
+        mock_session = AsyncMock()
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+
+        other_user = User(keycloak_id="other-keycloak-id", internal_id=456, name="Other User", role="default")
+
+        # Execute
+        result = await user_repository.save_many([sample_user, other_user])
+
+        # Assertions
+        assert result == [sample_user, other_user]
+        mock_session.execute.assert_called_once()
+        assert len(mock_session.execute.call_args[0][1]) == 2
+        mock_session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_upsert_user_success(self, user_repository, sample_user, mock_db_config):
+        """Test that upserting a user issues a single statement and returns the stored row."""
+        # Mock session
+        mock_session = AsyncMock()
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+
+        # Mock the RETURNING row
+        mock_result = MagicMock()
+        mock_result.one.return_value._asdict.return_value = sample_user.model_dump()
+        mock_session.execute.return_value = mock_result
+
+        # Execute
+        result = await user_repository.upsert(sample_user)
+
+        # Assertions
+        assert result.model_dump() == sample_user.model_dump()
+        mock_session.execute.assert_called_once()
+        mock_session.commit.assert_called_once()
+        mock_session.refresh.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_upsert_user_database_error(self, user_repository, sample_user, mock_db_config):
+        """Test that a failing upsert is rolled back and reported as a ValidationError."""
+        # Mock session
+        mock_session = AsyncMock()
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+        mock_session.execute.side_effect = Exception("Database error")
+
+        # Execute and assert
+        with pytest.raises(ValidationError, match="Failed to upsert user"):
+            await user_repository.upsert(sample_user)
+        mock_session.rollback.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_by_keycloak_id_success(self, user_repository, sample_user, mock_db_config):
         """Test successful user retrieval by keycloak_id."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock user found
         mock_result = MagicMock()
@@ -93,13 +147,42 @@ class TestUserRepository:
         assert result == sample_user
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.user_repository.AsyncSession")
-    async def test_get_by_keycloak_id_not_found(self, mock_async_session, user_repository, mock_db_config):
+    async def test_get_by_keycloak_id_cached(self, user_repository, sample_user, mock_db_config):
+        """Test repeated and concurrent reads of a user share one query until the user is written."""
+        # Mock session
+        mock_session = AsyncMock()
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+
+        # Mock user found
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = sample_user
+        mock_session.execute.return_value = mock_result
+
+        # Execute
+        results = await asyncio.gather(
+            user_repository.get_by_keycloak_id("test-keycloak-id"),
+            user_repository.get_by_keycloak_id("test-keycloak-id"),
+        )
+        assert await user_repository.user_exists("test-keycloak-id")
+
+        # Assertions
+        assert results == [sample_user, sample_user]
+        assert mock_session.execute.call_count == 1
+
+        # Deleting the user drops it from the cache
+        await user_repository.delete_by_keycloak_id("test-keycloak-id")
+        mock_session.execute.reset_mock()
+        await user_repository.get_by_keycloak_id("test-keycloak-id")
+        assert mock_session.execute.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_get_by_keycloak_id_not_found(self, user_repository, mock_db_config):
         """Test user retrieval when user doesn't exist."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock user not found
         mock_result = MagicMock()
@@ -111,18 +194,23 @@ class TestUserRepository:
             await user_repository.get_by_keycloak_id("non-existent-id")
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.user_repository.AsyncSession")
-    async def test_update_user_success(self, mock_async_session, user_repository, sample_user, mock_db_config):
+    async def test_update_user_success(self, user_repository, sample_user, mock_db_config):
         """Test successful user update."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
-
-        # Mock existing user for the existence check
-        existing_user = User(keycloak_id="test-keycloak-id", internal_id=123, name="Old Name", role="user")
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+
+        # Mock the row returned by UPDATE ... RETURNING
+        mock_row = MagicMock()
+        mock_row._asdict.return_value = {
+            "keycloak_id": sample_user.keycloak_id,
+            "internal_id": sample_user.internal_id,
+            "name": sample_user.name,
+            "role": sample_user.role,
+        }
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = existing_user
+        mock_result.one_or_none.return_value = mock_row
         mock_session.execute.return_value = mock_result
 
         # Execute
@@ -131,17 +219,35 @@ class TestUserRepository:
         # Assertions
         assert result.name == sample_user.name
         assert result.role == sample_user.role
+        mock_session.execute.assert_called_once()
         mock_session.commit.assert_called_once()
-        mock_session.refresh.assert_called_once()
+        mock_session.refresh.assert_not_called()
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.user_repository.AsyncSession")
-    async def test_delete_user_success(self, mock_async_session, user_repository, sample_user, mock_db_config):
+    async def test_update_user_not_found(self, user_repository, sample_user, mock_db_config):
+        """Test user update when no row matches the Keycloak ID."""
+        # Mock session
+        mock_session = AsyncMock()
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+
+        # Mock UPDATE ... RETURNING without rows
+        mock_result = MagicMock()
+        mock_result.one_or_none.return_value = None
+        mock_session.execute.return_value = mock_result
+
+        # Execute and assert
+        with pytest.raises(ValidationError, match="not found"):
+            await user_repository.update(sample_user)
+        mock_session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_delete_user_success(self, user_repository, sample_user, mock_db_config):
         """Test successful user deletion."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock existing user
         mock_result = MagicMock()
@@ -156,13 +262,12 @@ class TestUserRepository:
         mock_session.commit.assert_called_once()
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.user_repository.AsyncSession")
-    async def test_get_all_users(self, mock_async_session, user_repository, sample_user, mock_db_config):
+    async def test_get_all_users(self, user_repository, sample_user, mock_db_config):
         """Test retrieving all users."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock users
         users = [sample_user]
@@ -179,13 +284,89 @@ class TestUserRepository:
         assert result == users
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.user_repository.AsyncSession")
-    async def test_user_exists_true(self, mock_async_session, user_repository, sample_user, mock_db_config):
+    async def test_get_all_users_iter(self, user_repository, sample_user, mock_db_config):
+        """Test streaming all users."""
+        # Mock session
+        mock_session = AsyncMock()
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+
+        # Mock the streamed result
+        async def stream():
+            yield sample_user
+
+        mock_session.stream_scalars.return_value = stream()
+
+        # Execute
+        result = [user async for user in user_repository.get_all_users_iter()]
+
+        # Assertions
+        assert result == [sample_user]
+        mock_session.stream_scalars.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_by_keycloak_ids(self, user_repository, sample_user, mock_db_config):
+        """Test retrieving several users by Keycloak ID in one query."""
+        # Mock session
+        mock_session = AsyncMock()
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+
+        # Mock users
+        users = [sample_user]
+        mock_result = MagicMock()
+        mock_scalars = MagicMock()
+        mock_scalars.all.return_value = users
+        mock_result.scalars.return_value = mock_scalars
+        mock_session.execute.return_value = mock_result
+
+        # Execute
+        result = await user_repository.get_by_keycloak_ids([sample_user.keycloak_id, "missing"])
+
+        # Assertions
+        assert result == users
+        mock_session.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_users_by_roles(self, user_repository, sample_user, mock_db_config):
+        """Test retrieving the users of several roles in one query, grouped by role."""
+        # Mock session
+        mock_session = AsyncMock()
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+
+        # Mock users
+        manager = User(keycloak_id="manager-keycloak-id", internal_id=456, name="Manager", role="manager")
+        mock_result = MagicMock()
+        mock_scalars = MagicMock()
+        mock_scalars.all.return_value = [sample_user, manager]
+        mock_result.scalars.return_value = mock_scalars
+        mock_session.execute.return_value = mock_result
+
+        # Execute
+        result = await user_repository.get_users_by_roles(["admin", "manager", "default"])
+
+        # Assertions
+        assert result["admin"] == [sample_user]
+        assert result["manager"] == [manager]
+        assert result["default"] == []
+        mock_session.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_by_keycloak_ids_empty(self, user_repository, mock_db_config):
+        """Test that an empty ID list returns without querying the database."""
+        result = await user_repository.get_by_keycloak_ids([])
+
+        assert result == []
+        mock_db_config.session_factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_user_exists_true(self, user_repository, sample_user, mock_db_config):
         """Test user_exists when user exists."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock user found
         mock_result = MagicMock()
@@ -199,13 +380,12 @@ class TestUserRepository:
         assert result is True
 
     @pytest.mark.asyncio
-    @patch("sso_anythingllm_repository.user_repository.AsyncSession")
-    async def test_user_exists_false(self, mock_async_session, user_repository, mock_db_config):
+    async def test_user_exists_false(self, user_repository, mock_db_config):
         """Test user_exists when user doesn't exist."""
         # Mock session
         mock_session = AsyncMock()
-        mock_async_session.return_value.__aenter__.return_value = mock_session
-        mock_async_session.return_value.__aexit__.return_value = None
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
 
         # Mock user not found
         mock_result = MagicMock()
@@ -217,3 +397,23 @@ class TestUserRepository:
 
         # Assertions
         assert result is False
+
+    @pytest.mark.asyncio
+    async def test_count_users(self, user_repository, mock_db_config):
+        """Test counting users with a single COUNT(*) query."""
+        # Mock session
+        mock_session = AsyncMock()
+        mock_db_config.session_factory.return_value.__aenter__.return_value = mock_session
+        mock_db_config.session_factory.return_value.__aexit__.return_value = None
+
+        # Mock the COUNT(*) result
+        mock_result = MagicMock()
+        mock_result.scalar_one.return_value = 3
+        mock_session.execute.return_value = mock_result
+
+        # Execute
+        result = await user_repository.count_users()
+
+        # Assertions
+        assert result == 3
+        mock_session.execute.assert_called_once()
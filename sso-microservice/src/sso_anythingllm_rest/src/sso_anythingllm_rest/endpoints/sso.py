@@ -12,7 +12,7 @@ from pydantic import BaseModel
 from starlette.status import HTTP_200_OK
 
 from sso_anythingllm_facade.interfaces.sso_facade_interface import SSOFacadeInterface
-from sso_anythingllm_facade.sso_facade import NotAuthorizedException
+from sso_anythingllm_facade.sso_facade import AnythingLLMUnavailableException, NotAuthorizedException
 from sso_anythingllm_rest.dependencies import LazySingleton
 
 # ───────────────────────────────────────────────────────────────────────────────────────────── #
@@ -83,3 +83,5 @@ async def get_sso_url(current_user: Annotated[Dict, Depends(get_current_user)])
         return await sso_facade.get_anything_llm_sso_url(user=current_user)
     except NotAuthorizedException as error:
         raise HTTPException(status_code=403, detail=error.message)
+    except AnythingLLMUnavailableException as error:
+        raise HTTPException(status_code=503, detail=error.message)
@@ -13,6 +13,7 @@ from pyctuator.health.db_health_provider import DbHealthProvider
 from pyctuator.pyctuator import Pyctuator
 
 from sso_anythingllm_facade.setup_di import setup_di as setup_facade_di
+from sso_anythingllm_repository.config import AsyncPostgresConf
 from sso_anythingllm_repository.setup_di import setup_di as setup_repository_di
 from sso_anythingllm_rest import __version__ as app_version
 
@@ -21,14 +22,22 @@ from sso_anythingllm_rest.endpoints import sso
 from sso_anythingllm_rest.setup_di import setup_di as setup_rest_di
 from sso_anythingllm_service.monitoring.anythingllm_api_health_monitor import AnythingLlmApiHealthMonitor
 from sso_anythingllm_service.setup_di import setup_di as setup_service_di
+from sso_anythingllm_service.setup_di import teardown_di as teardown_service_di
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle."""
     logger.info("Starting AnythingLLM SSO Integration API...")
+    try:
+        await di[AsyncPostgresConf].warm_up()
+    except Exception as e:
+        # Not fatal, the pool opens connections on demand and the health endpoint reports the database status.
+        logger.warning(f"Could not warm up the database connection pool: {e}")
     yield
     logger.info("Shutting down AnythingLLM SSO Integration API...")
+    await teardown_service_di()
+    await di[AsyncPostgresConf].engine.dispose()
 
 
 def create_app() -> FastAPI:
@@ -1,3 +1,4 @@
+import httpx
 from kink import inject
 
 from sso_anythingllm_dto.api_key import ApiKeyDto
@@ -14,10 +15,16 @@ from sso_anythingllm_service.interfaces.api_key_service_interface import ApiKeyS
 class ApiKeyService(ApiKeyServiceInterface):
     """Service for managing API keys with full CRUD operations."""
 
-    def __init__(self, api_key_repository: ApiKeyRepositoryInterface, anything_llm_config: AnythingLLMConfig):
+    def __init__(
+        self,
+        api_key_repository: ApiKeyRepositoryInterface,
+        anything_llm_config: AnythingLLMConfig,
+        http_client: httpx.AsyncClient,
+    ):
         self.api_key_repository = api_key_repository
         self.mapper = ApiKeyDTOEntityMapper()
         self.anything_llm_config = anything_llm_config
+        self.http_client = http_client
 
     # ──────────────────────────── GET ────────────────────────────
     async def get_api_key_by_value(self, value: str) -> ApiKeyDto:
@@ -28,7 +35,12 @@ class ApiKeyService(ApiKeyServiceInterface):
     async def get_all_api_keys(self) -> list[ApiKeyDto]:
         """Get all API keys."""
         entities = await self.api_key_repository.get_all_api_keys()
-        return [self.mapper.from_target(entity) for entity in entities]
+        return self.mapper.from_targets(entities)
+
+    async def get_first_api_key(self) -> ApiKeyDto | None:
+        """Get a single API key, or None if there is none."""
+        entity = await self.api_key_repository.get_first_api_key()
+        return self.mapper.from_target(entity) if entity is not None else None
 
     async def api_key_exists(self, value: str) -> bool:
         """Check if an API key exists by its value."""
@@ -75,6 +87,6 @@ class ApiKeyService(ApiKeyServiceInterface):
             base_url=self.anything_llm_config.url,
             verify_ssl=self.anything_llm_config.verify_ssl,
         )
-        repo: AnythingLLMRepositoryInterface = AnythingLLMRepository(config=config)
+        repo: AnythingLLMRepositoryInterface = AnythingLLMRepository(config=config, client=self.http_client)
         result = await repo.create_api_key(auth_token=auth_token)
         return ApiKeyDto(value=result["apiKey"]["secret"])
@@ -1,3 +1,4 @@
+import httpx
 from kink import inject
 
 from sso_anythingllm_dto.config.anything_llm import AnythingLLMConfig
@@ -9,8 +10,9 @@ from sso_anythingllm_service.interfaces.auth_service_interface import AuthServic
 
 @inject(alias=AuthServiceInterface)
 class AuthService(AuthServiceInterface):
-    def __init__(self, anything_llm_config: AnythingLLMConfig):
+    def __init__(self, anything_llm_config: AnythingLLMConfig, http_client: httpx.AsyncClient):
         self.anything_llm_config = anything_llm_config
+        self.http_client = http_client
 
     async def obtain_auth_token_for_admin(self) -> str:
         """Obtain the SSO single use URL for the user, via AnythingLLM's Rest API"""
@@ -18,7 +20,7 @@ class AuthService(AuthServiceInterface):
             base_url=self.anything_llm_config.url,
             verify_ssl=self.anything_llm_config.verify_ssl,
         )
-        repo: AnythingLLMRepositoryInterface = AnythingLLMRepository(config=config)
+        repo: AnythingLLMRepositoryInterface = AnythingLLMRepository(config=config, client=self.http_client)
         result = await repo.obtain_auth_token(
             credentials_data={
                 "username": self.anything_llm_config.admin_user,
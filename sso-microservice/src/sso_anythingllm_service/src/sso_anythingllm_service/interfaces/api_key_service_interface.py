@@ -17,6 +17,10 @@ class ApiKeyServiceInterface(Protocol):
         """Get all API keys"""
         ...
 
+    async def get_first_api_key(self) -> ApiKeyDto | None:
+        """Get a single API key, or None if there is none"""
+        ...
+
     async def api_key_exists(self, value: str) -> bool:
         """Check if an API key exists by its value"""
         ...
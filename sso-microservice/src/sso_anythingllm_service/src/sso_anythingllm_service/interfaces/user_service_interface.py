@@ -17,9 +17,18 @@ class UserServiceInterface(Protocol):
         """Get a provider property type by ID"""
         ...
 
+    async def get_users_by_keycloak_ids(self, keycloak_ids: list[str]) -> dict[str, AnythingLLMUserDto]:
+        """Get the existing users among the given Keycloak IDs, by Keycloak ID"""
+        ...
+
     # ──────────────────────────── CREATE ────────────────────────────
     async def save(self, user: AnythingLLMUserDto) -> AnythingLLMUserDto: ...
 
+    # ──────────────────────────── UPSERT ────────────────────────────
+    async def upsert(self, user: AnythingLLMUserDto) -> AnythingLLMUserDto:
+        """Create the user or overwrite the stored one, in a single database round trip"""
+        ...
+
     # ──────────────────────────── UPDATE ────────────────────────────
     async def update(self, user: AnythingLLMUserDto) -> AnythingLLMUserDto: ...
 
@@ -1,16 +1,25 @@
+import httpx
 from kink import di
 
 from sso_anythingllm_dto.config.anything_llm import AnythingLLMConfig
-from sso_anythingllm_dto.config.keycloak import KeycloakTokenConfig
+from sso_anythingllm_dto.config.keycloak import KeycloakTokenConfig, get_keycloak_config
+from sso_anythingllm_repository import CLIENT_LIMITS
 
 
 def setup_di():
     # Exporting configuration into dependency injection context.
     # Keycloak configuration
-    keycloak_config = KeycloakTokenConfig()
+    keycloak_config = get_keycloak_config()
     # AnythingLLM configuration
     anythingllm_config = AnythingLLMConfig()
     di[KeycloakTokenConfig] = keycloak_config
     di[AnythingLLMConfig] = anythingllm_config
+    # HTTP client shared by every AnythingLLM call, so SSO requests reuse warm connections instead of opening new ones.
+    di[httpx.AsyncClient] = httpx.AsyncClient(verify=anythingllm_config.verify_ssl, limits=CLIENT_LIMITS)
 
     print("Dependency injection finished.")
+
+
+async def teardown_di():
+    # Release the pooled connections of the shared HTTP client.
+    await di[httpx.AsyncClient].aclose()
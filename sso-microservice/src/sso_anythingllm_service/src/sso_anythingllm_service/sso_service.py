@@ -1,3 +1,4 @@
+import httpx
 from kink import inject
 
 from sso_anythingllm_dto.config.anything_llm import AnythingLLMConfig
@@ -9,15 +10,21 @@ from sso_anythingllm_service.interfaces.sso_service_interface import SSOServiceI
 
 @inject(alias=SSOServiceInterface)
 class SSOService(SSOServiceInterface):
-    def __init__(self, anything_llm_config: AnythingLLMConfig):
+    def __init__(self, anything_llm_config: AnythingLLMConfig, http_client: httpx.AsyncClient):
         self.anything_llm_config = anything_llm_config
+        self.http_client = http_client
 
     # ──────────────────────────── GET ────────────────────────────
     async def get_sso_url_for_user(self, anything_llm_user_id: int, api_key: str) -> str:
         """Obtain the SSO single use URL for the user, via AnythingLLM's Rest API"""
+        # No retries: the facade bounds this call with a short timeout the retry backoff would never fit in, and
+        # each attempt issues a new single use token.
         config: RepoConfig = RepoConfig(
-            base_url=self.anything_llm_config.url, verify_ssl=self.anything_llm_config.verify_ssl, api_key=api_key
+            base_url=self.anything_llm_config.url,
+            verify_ssl=self.anything_llm_config.verify_ssl,
+            api_key=api_key,
+            max_retries=0,
         )
-        repo: AnythingLLMRepositoryInterface = AnythingLLMRepository(config=config)
+        repo: AnythingLLMRepositoryInterface = AnythingLLMRepository(config=config, client=self.http_client)
         result = await repo.issue_auth_token(user_id=anything_llm_user_id)
         return self.anything_llm_config.url + result["loginPath"]
@@ -1,3 +1,4 @@
+import httpx
 from kink import inject
 
 from sso_anythingllm_dto.config.anything_llm import AnythingLLMConfig
@@ -12,10 +13,16 @@ from sso_anythingllm_service.interfaces.user_service_interface import UserServic
 
 @inject(alias=UserServiceInterface)
 class UserService(UserServiceInterface):
-    def __init__(self, user_repository: UserRepositoryInterface, anything_llm_config: AnythingLLMConfig):
+    def __init__(
+        self,
+        user_repository: UserRepositoryInterface,
+        anything_llm_config: AnythingLLMConfig,
+        http_client: httpx.AsyncClient,
+    ):
         self.user_repository = user_repository
         self.mapper = AnythingLLMUserDTOEntityMapper()
         self.anything_llm_config = anything_llm_config
+        self.http_client = http_client
 
     # ──────────────────────────── GET ────────────────────────────
     async def get_user_by_keycloak_id(self, keycloak_id: str) -> AnythingLLMUserDto:
@@ -28,6 +35,11 @@ class UserService(UserServiceInterface):
         entity = await self.user_repository.get_by_anythingllm_id(anythingllm_id)
         return self.mapper.from_target(entity)
 
+    async def get_users_by_keycloak_ids(self, keycloak_ids: list[str]) -> dict[str, AnythingLLMUserDto]:
+        """Get the existing users among the given Keycloak IDs, by Keycloak ID."""
+        entities = await self.user_repository.get_by_keycloak_ids(keycloak_ids)
+        return {dto.keycloak_id: dto for dto in self.mapper.from_targets(entities)}
+
     def _sanitise_anythingllm_username(self, username: str) -> str:
         """Sanitises the username string to align with internal AnythingLLM's policies:
         Username must only contain lowercase letters, periods, numbers, underscores, and hyphens with no spaces"}
@@ -46,7 +58,7 @@ class UserService(UserServiceInterface):
         config: RepoConfig = RepoConfig(
             base_url=self.anything_llm_config.url, verify_ssl=self.anything_llm_config.verify_ssl, api_key=api_key
         )
-        repo: AnythingLLMRepositoryInterface = AnythingLLMRepository(config=config)
+        repo: AnythingLLMRepositoryInterface = AnythingLLMRepository(config=config, client=self.http_client)
         result = await repo.create_user(
             user_data={
                 "username": self._sanitise_anythingllm_username(user.keycloak_id),
@@ -56,6 +68,12 @@ class UserService(UserServiceInterface):
         )
         return int(result["user"]["id"])
 
+    # ──────────────────────────── UPSERT ────────────────────────────
+    async def upsert(self, user: AnythingLLMUserDto) -> AnythingLLMUserDto:
+        """Create the user or overwrite the stored one, in a single database round trip."""
+        entity = await self.user_repository.upsert(self.mapper.to_target(user))
+        return self.mapper.from_target(entity)
+
     # ──────────────────────────── UPDATE ────────────────────────────
     async def update(self, user: AnythingLLMUserDto) -> AnythingLLMUserDto:
         entity = await self.user_repository.update(self.mapper.to_target(user))
@@ -66,7 +84,7 @@ class UserService(UserServiceInterface):
         config: RepoConfig = RepoConfig(
             base_url=self.anything_llm_config.url, verify_ssl=self.anything_llm_config.verify_ssl, api_key=api_key
         )
-        repo: AnythingLLMRepositoryInterface = AnythingLLMRepository(config=config)
+        repo: AnythingLLMRepositoryInterface = AnythingLLMRepository(config=config, client=self.http_client)
         if user.internal_id is None:
             raise ValueError("User needs to have an internal AnythingLLM id to be updatable.")
         else:
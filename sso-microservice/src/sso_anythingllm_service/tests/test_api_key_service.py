@@ -9,9 +9,11 @@ This test suite verifies that the ApiKeyService correctly:
 
 from unittest.mock import MagicMock
 
+import httpx
 import pytest
 
 from sso_anythingllm_dto.api_key import ApiKeyDto
+from sso_anythingllm_dto.config.anything_llm import AnythingLLMConfig
 from sso_anythingllm_entity.api_key import ApiKey
 from sso_anythingllm_repository.interfaces.api_key_repository_interface import ApiKeyRepositoryInterface
 from sso_anythingllm_service.api_key_service import ApiKeyService
@@ -28,7 +30,9 @@ class TestApiKeyService:
     @pytest.fixture
     def api_key_service(self, mock_api_key_repository):
         """Create ApiKeyService instance with mocked dependencies."""
-        return ApiKeyService(mock_api_key_repository)
+        return ApiKeyService(
+            mock_api_key_repository, MagicMock(spec=AnythingLLMConfig), MagicMock(spec=httpx.AsyncClient)
+        )
 
     @pytest.fixture
     def sample_api_key_dto(self):
@@ -69,6 +73,32 @@ class TestApiKeyService:
         assert result[0].value == sample_api_key_entity.value
         mock_api_key_repository.get_all_api_keys.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_get_first_api_key_success(self, api_key_service, mock_api_key_repository, sample_api_key_entity):
+        """Test successful retrieval of a single API key."""
+        # Mock repository response
+        mock_api_key_repository.get_first_api_key.return_value = sample_api_key_entity
+
+        # Execute
+        result = await api_key_service.get_first_api_key()
+
+        # Assertions
+        assert result is not None
+        assert result.value == sample_api_key_entity.value
+        mock_api_key_repository.get_first_api_key.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_first_api_key_none(self, api_key_service, mock_api_key_repository):
+        """Test get_first_api_key when there are no API keys."""
+        # Mock repository response
+        mock_api_key_repository.get_first_api_key.return_value = None
+
+        # Execute
+        result = await api_key_service.get_first_api_key()
+
+        # Assertions
+        assert result is None
+
     @pytest.mark.asyncio
     async def test_api_key_exists_true(self, api_key_service, mock_api_key_repository):
         """Test api_key_exists when API key exists."""
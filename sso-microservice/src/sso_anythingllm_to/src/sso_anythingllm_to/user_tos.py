@@ -1,9 +1,10 @@
 """This module contains the Model related transport objects"""
 
-from pydantic import BaseModel
+from dataclasses import dataclass
 
 
-class KeycloakUserTo(BaseModel):
+@dataclass(slots=True, frozen=True)
+class KeycloakUserTo:
     """Transport object for wrapping information coming from Keycloak JWT token."""
 
     username: str